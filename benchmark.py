@@ -0,0 +1,92 @@
+import argparse
+import csv
+from rangingtool.benchmark import load_dataset, simulate_dataset, benchmark_matrix
+
+
+def parse_list(text, type_=str):
+    """Parse comma-separated list, whereby 'none' is None."""
+    return [None if value.lower() == 'none' else type_(value) for value in text.split(',')]
+
+
+def main():
+    # Init argument parser
+    parser = argparse.ArgumentParser(description='Benchmark of processor configurations.')
+    parser.add_argument('--dataset', type=str, required=False, help='Raw data file, simulated if not given')
+    parser.add_argument('--frames', type=int, default=100, required=False, help='Number of simulated frames')
+    parser.add_argument('--estimators', type=str, default='QIPS', required=False)
+    parser.add_argument('--windows', type=str, default='hann,hamming,blackman,boxcar', required=False)
+    parser.add_argument('--td_length_factors', type=str, default='1,2,4', required=False)
+    parser.add_argument('--if_path_filters', type=str, default='phase,none', required=False)
+    parser.add_argument('--use_phase', type=str, default='1,0', required=False)
+    parser.add_argument('--nfc_modes', type=str, default='none,AM2,PM', required=False)
+    parser.add_argument('--d1', type=float, default=0, required=False, help='AM2 parameter (mm)')
+    parser.add_argument('--d2', type=float, default=0, required=False, help='AM2 parameter (mm)')
+    parser.add_argument('--a_tot', type=float, default=0, required=False, help='PM parameter (cm^2)')
+    parser.add_argument('--r_off', type=float, default=0, required=False, help='PM parameter (cm)')
+    parser.add_argument('--nfc_func', type=str, required=False, help='PPV file for NFC mode func')
+    parser.add_argument('--roi', type=str, default='0.15,10', required=False, help='ROI (m)')
+    parser.add_argument('--precision', type=float, required=False, help='Budget of distance std (um)')
+    parser.add_argument('--output', type=str, required=False, help='CSV file of results')
+    args = parser.parse_args()
+
+    # Load or simulate dataset
+    if args.dataset is not None:
+        if_data, radar_config = load_dataset(args.dataset)
+    else:
+        if_data, radar_config = simulate_dataset(args.frames)
+
+    # Run benchmark matrix
+    rows = []
+    results = benchmark_matrix(
+        if_data, radar_config,
+        estimators=parse_list(args.estimators),
+        windows=parse_list(args.windows),
+        td_length_factors=parse_list(args.td_length_factors, int),
+        if_path_filters=parse_list(args.if_path_filters),
+        use_phase=parse_list(args.use_phase, lambda value: bool(int(value))),
+        nfc_modes=args.nfc_modes.split(','),
+        nfc_params={'d1': args.d1 * 1E-3, 'd2': args.d2 * 1E-3, 'a_tot': args.a_tot * 1E-2**2,
+                    'r_off': args.r_off * 1E-2, 'func_filename': args.nfc_func},
+        roi=[float(value) * 2 / 3E8 for value in args.roi.split(',')]
+    )
+    header = '%-10s %-10s %-9s %-8s %-6s %-5s %14s %12s %14s' % (
+        'estimator', 'window', 'td_length', 'filter', 'phase', 'nfc', 'time (ms)', 'memory (MB)', 'std (um)')
+    print(header)
+    print('-' * len(header))
+    for options, result in results:
+        row = dict(options, **result)
+        rows.append(row)
+        line = '%-10s %-10s %-9d %-8s %-6s %-5s ' % (
+            options['estimator'], options['window'], options['td_length'], options['if_path_filter'],
+            options['use_phase'], options['nfc'])
+        if 'error' in result:
+            print(line + 'failed: ' + result['error'])
+        else:
+            print(line + '%14.3f %12.2f %14.3f' % (
+                result['time_per_frame'] * 1E3, result['peak_memory'] / 1E6, result['distance_std'] * 1E6))
+
+    # Fastest configuration meeting the precision budget
+    if args.precision is not None:
+        candidates = [
+            row for row in rows if 'error' not in row and row['distance_std'] * 1E6 <= args.precision
+        ]
+        if len(candidates) > 0:
+            best = min(candidates, key=lambda row: row['time_per_frame'])
+            print('\nFastest configuration within %.3f um: %s' % (args.precision, ', '.join(
+                '%s=%s' % (key, best[key])
+                for key in ('estimator', 'window', 'td_length', 'if_path_filter', 'use_phase', 'nfc')
+            )))
+        else:
+            print('\nNo configuration within %.3f um' % args.precision)
+
+    # Save results
+    if args.output is not None:
+        keys = sorted({key for row in rows for key in row})
+        with open(args.output, 'w', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=keys)
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+if __name__ == '__main__':
+    main()
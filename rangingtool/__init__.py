@@ -4,4 +4,5 @@ from .calibration import *
 from .echo import *
 from .history import *
 from .mainwin import *
+from .waterfall import *
 
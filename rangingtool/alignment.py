@@ -1,10 +1,10 @@
-from PyQt5 import QtWidgets, QtGui, QtCore, uic
+from PyQt5 import QtWidgets, uic
 import numpy as np
 from pkg_resources import resource_filename
 
 
 class AlignmentWindow(QtWidgets.QWidget):
-    def __init__(self, background_process, *args, **kwargs):
+    def __init__(self, background_process, render_scheduler, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
         # Initialize appearance of the UI
@@ -12,6 +12,7 @@ class AlignmentWindow(QtWidgets.QWidget):
 
         # Declare Variables
         self.background_process = background_process
+        self.render_scheduler = render_scheduler
         self.signal_strength = None
         self.max_signal_strength = None
         self.snr = None
@@ -22,36 +23,34 @@ class AlignmentWindow(QtWidgets.QWidget):
         self.label_range_1.setText('0 ... 100 %%')
         self.label_range_2.setText('%d ... 100 %%' % (100 - self.level_range))
 
-        # Update measured data timer
-        self.update_measured_data_timer = QtCore.QTimer()
-        self.update_measured_data_timer.timeout.connect(self.update_measured_data)
-        self.update_measured_data_timer.start(100)
+        # Register at render clock
+        self.render_scheduler.register(self, self.update_measured_data)
 
         # Signals
         self.btn_reset_indicator.clicked.connect(self.btn_reset_indicator_clicked)
 
         # Slots to background process
-        self.background_process.new_data_signal.connect(self.new_data)
+        self.background_process.mailbox.new_data_signal.connect(self.new_data)
 
     def closeEvent(self, event):
-        # Stop timer & Disconnect new data signal
-        self.update_measured_data_timer.stop()
-        self.background_process.new_data_signal.disconnect(self.new_data)
+        # Unregister from render clock & Disconnect new data signal
+        self.render_scheduler.unregister(self)
+        self.background_process.mailbox.new_data_signal.disconnect(self.new_data)
 
         event.accept()
 
     def new_data(self, value):
         """Slot for incoming data."""
         # Update measured values
-        if not np.isnan(np.mean(value['power_db'])):
+        if not np.isnan(value.signal_strength):
             # Filter signal strength value by IIR lowpass filter
-            x = np.mean(value['power_db'])
+            x = value.signal_strength
             self.signal_strength = (x if self.signal_strength is None
                                     else (1 - self.a1) * x + self.a1 * self.signal_strength)
 
-        if not np.isnan(np.mean(value['snr_db'])):
+        if not np.isnan(value.snr):
             # Filter SNR value by IIR lowpass filter
-            x = np.mean(value['snr_db'])
+            x = value.snr
             self.snr = (x if self.snr is None
                         else (1 - self.a1) * x + self.a1 * self.snr)
 
@@ -61,6 +60,8 @@ class AlignmentWindow(QtWidgets.QWidget):
         elif self.signal_strength > self.max_signal_strength:
             self.max_signal_strength = self.signal_strength
 
+        self.render_scheduler.mark_dirty(self)
+
     def update_measured_data(self):
         """Slot to timer for updating user interface with measured data."""
         # Update signal level
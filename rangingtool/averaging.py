@@ -0,0 +1,68 @@
+import numpy as np
+
+
+class RunningComplexStatistics:
+    """Running mean and variance of complex arrays (Welford's algorithm) in O(1) memory per element."""
+    def __init__(self):
+        """Initialize statistics."""
+        self.count = 0
+        self.mean = None
+        self._m2 = None  # Sum of squared magnitudes of the deviations from the mean
+
+    def update(self, value):
+        """Add array of constant shape."""
+        value = np.asarray(value, dtype=complex)
+        self.count += 1
+        if self.mean is None:
+            self.mean = value.copy()
+            self._m2 = np.zeros(value.shape)
+        else:
+            delta = value - self.mean
+            self.mean += delta / self.count
+            self._m2 += np.real(delta * np.conj(value - self.mean))
+
+    @property
+    def variance(self):
+        """Sample variance, i.e., mean squared magnitude of the deviations from the mean."""
+        if self.count < 2:
+            return None if self.mean is None else np.full(self.mean.shape, np.nan)
+        return self._m2 / (self.count - 1)
+
+    def relative_standard_error_db(self):
+        """Get median standard error of the mean relative to its magnitude (dB), as a measure of convergence."""
+        if self.count < 2:
+            return np.nan
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return 20 * np.log10(np.nanmedian(np.sqrt(self.variance / self.count) / np.abs(self.mean)))
+
+
+class RunningStatistics:
+    """Running mean and standard deviation of real values in O(1) memory (Welford's algorithm, merged per batch)."""
+    def __init__(self):
+        """Initialize statistics."""
+        self.count = 0
+        self._mean = 0.
+        self._m2 = 0.  # Sum of squared deviations from the mean
+
+    def update(self, values):
+        """Add values, whereby NaN values are ignored."""
+        values = np.ravel(np.asarray(values, dtype=float))
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        count = self.count + len(values)
+        mean = np.mean(values)
+        delta = mean - self._mean
+        self._mean += delta * len(values) / count
+        self._m2 += np.sum((values - mean) ** 2) + delta ** 2 * self.count * len(values) / count
+        self.count = count
+
+    @property
+    def mean(self):
+        """Mean, or NaN if no values."""
+        return self._mean if self.count > 0 else np.nan
+
+    @property
+    def std(self):
+        """Standard deviation (normalized by the number of values, as numpy.std), or NaN if no values."""
+        return np.sqrt(self._m2 / self.count) if self.count > 0 else np.nan
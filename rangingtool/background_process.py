@@ -1,18 +1,317 @@
 import numpy as np
 from PyQt5 import QtCore
+from collections import deque
 from contextlib import ExitStack
+from copy import deepcopy
+from threading import Condition, Lock, Thread
+from time import perf_counter
 from warnings import warn
 from twopilabs.sense.x1000 import SenseX1000
 from twopilabs.utils.usbtmc.usbtmc_exception import UsbTmcTimeoutException
 import mmwranging
 import dracalvcp
+from .detection import MultiTargetDetector
+from .pyramid import MinMaxPyramid
+from .shared_frames import SharedFrameRing
+from .metrics import LoopMetrics
+from .averaging import RunningComplexStatistics
+
+
+def configure_radar(radar_device, sweep_mode):
+    """Configure radar device, and get its configuration. sweep_mode is the SweepMode enum of the device class."""
+    # Recall preset and clear registers
+    radar_device.core.rst()
+    radar_device.core.cls()
+
+    # Configure radar
+    radar_device.sense.frequency_start(182E9)
+    radar_device.sense.frequency_stop(126E9)
+    radar_device.sense.sweep_time(2E-3)
+    radar_device.sense.sweep_count(2 * 3)
+    radar_device.sense.sweep_period(10E-3)
+    radar_device.sense.sweep_mode(getattr(sweep_mode, 'ALTERNATING'))
+    radar_device.calc.trace_list([0])  # Centered channel
+    radar_device.control.accessory_enable(False)  # Disable LED
+    radar_config = radar_device.sense.dump()  # Dump radar configuration
+
+    # Update effective center frequency
+    radar_config['FREQUENCY']['CENTER'] = 154007370664
+
+    return radar_config
+
+
+def create_processor(radar_config, **kwargs):
+    """Create ranging processor for radar configuration, with default calibration loaded.
+
+    Keyword arguments override the default options of the processor.
+    """
+    if_data_order = {
+        True: 'ud',
+        False: 'du'
+    }[radar_config['FREQUENCY']['STOP'] > radar_config['FREQUENCY']['START']]
+
+    options = dict(
+        td_length=radar_config['SWEEP']['POINTS'] * 1,
+        use_triangular_modulation=True,
+        use_phase=True,
+        if_data_order=if_data_order,
+        estimator='QIPS',
+        window='hann',
+        refractive_index_model=None,
+        if_path_filter='phase',
+        nearfield_correction=None
+    )
+    options.update(kwargs)
+
+    proc = mmwranging.Processor(
+        radar_config['FREQUENCY']['CENTER'],
+        abs(radar_config['FREQUENCY']['STOP'] - radar_config['FREQUENCY']['START']),
+        radar_config['SWEEP']['TIME'],
+        radar_config['SWEEP']['POINTS'],
+        **options
+    )
+
+    # Load default signal calibration (RF-path frequency response)
+    data = np.load('./calibration/rf_path_2piSENSE.npz')
+    proc.load_rf_path_response(data['freq'], data['response'])
+
+    # Load default IF-path frequency response
+    data = np.genfromtxt('./calibration/if_path_sim_2piSENSE.txt', delimiter=',', skip_header=1).T
+    proc.load_if_path_response(data[0], 10 ** (data[1] / 20) * np.exp(1j * data[2] / 180 * np.pi))
+
+    return proc
+
+
+class FrameRecord:
+    """Raw and processed data of a frame, including scalar summaries computed once by the worker."""
+    __slots__ = (
+        'if_data', 'time_axis', 'td_data_db', 'distance', 'snr_db', 'power_db', 'refractive_index',
+        'target_distance', 'target_snr_db', 'target_power_db', 'temp', 'press', 'hum', 'co2',
+        'snr', 'signal_strength', 'refractivity'
+    )
+
+    def __init__(self, if_data, time_axis, td_data_db, distance, snr_db, power_db, refractive_index,
+                 target_distance=None, target_snr_db=None, target_power_db=None,
+                 temp=None, press=None, hum=None, co2=None):
+        """Initialize record, whereby target and atmospheric data are None if not available.
+
+        Target distances refer to the origin and direction of the processor, but are not near-field corrected.
+        """
+        self.if_data = if_data
+        self.time_axis = time_axis
+        self.td_data_db = td_data_db
+        self.distance = distance
+        self.snr_db = snr_db
+        self.power_db = power_db
+        self.refractive_index = refractive_index
+        self.target_distance = target_distance
+        self.target_snr_db = target_snr_db
+        self.target_power_db = target_power_db
+        self.temp = temp
+        self.press = press
+        self.hum = hum
+        self.co2 = co2
+
+        # Scalar summaries of all sweeps
+        self.snr = float(np.mean(snr_db))
+        self.signal_strength = float(np.mean(power_db))
+        self.refractivity = (float(np.mean(refractive_index)) - 1) * 1E6  # ppm
+
+
+class LatestFrameMailbox(QtCore.QObject):
+    """Coalescing single-slot mailbox delivering the latest frame to the GUI thread."""
+    # Signal to display consumers (emitted in the GUI thread)
+    new_data_signal = QtCore.pyqtSignal(object)
+
+    # Internal signal from worker, queued at most once at a time
+    _posted_signal = QtCore.pyqtSignal()
+
+    def __init__(self, *args, **kwargs):
+        """Initialize mailbox. Must be created in the GUI thread."""
+        super().__init__(*args, **kwargs)
+
+        self._lock = Lock()
+        self._frame = None
+        self._post_time = None
+        self._notify_pending = False
+
+        # Counters
+        self.posted = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.lag = 0.  # Lag of last delivered frame (s)
+        self.max_lag = 0.
+
+        self._posted_signal.connect(self._deliver, QtCore.Qt.QueuedConnection)
+
+    @property
+    def depth(self):
+        """Number of frames waiting for delivery (0 or 1)."""
+        return int(self._frame is not None)
+
+    def post(self, frame):
+        """Post frame from worker thread, replacing a frame that has not yet been delivered."""
+        with self._lock:
+            if self._frame is not None:
+                self.dropped += 1
+            self._frame = frame
+            self._post_time = perf_counter()
+            self.posted += 1
+            notify = not self._notify_pending
+            self._notify_pending = True
+
+        # Only one notification is queued in the event loop at any time
+        if notify:
+            self._posted_signal.emit()
+
+    def _deliver(self):
+        """Slot for delivering the latest frame to display consumers."""
+        with self._lock:
+            frame = self._frame
+            self._frame = None
+            self._notify_pending = False
+            if frame is None:
+                return
+            self.delivered += 1
+            self.lag = perf_counter() - self._post_time
+            self.max_lag = max(self.max_lag, self.lag)
+
+        self.new_data_signal.emit(frame)
+
+    def reset_counters(self):
+        """Reset drop and lag counters."""
+        with self._lock:
+            self.posted = self.delivered = self.dropped = 0
+            self.lag = self.max_lag = 0.
+
+
+class RecordingQueue(QtCore.QObject):
+    """Bounded FIFO queue delivering every frame to the GUI thread, while recording is enabled only.
+
+    If the queue is full, i.e., if the GUI thread stalls, posting blocks the worker until a frame is delivered or
+    recording is disabled (backpressure). Thus, no frame of a recorded series is lost, whereby the acquisition of the
+    next frame is delayed.
+    """
+    # Signal to recording consumers (emitted in the GUI thread)
+    new_data_signal = QtCore.pyqtSignal(object)
+
+    # Internal signal from worker, queued at most once at a time
+    _posted_signal = QtCore.pyqtSignal()
+
+    def __init__(self, maxlen=1000, *args, **kwargs):
+        """Initialize queue. Must be created in the GUI thread."""
+        super().__init__(*args, **kwargs)
+
+        self.maxlen = maxlen
+        self.enabled = False
+        self._lock = Lock()
+        self._not_full = Condition(self._lock)
+        self._frames = deque()  # Frames and their post times
+        self._notify_pending = False
+
+        # Counters
+        self.posted = 0
+        self.delivered = 0
+        self.stalls = 0  # Posts blocked by a full queue
+        self.stall_seconds = 0.
+        self.lag = 0.  # Lag of last delivered frame (s)
+        self.max_lag = 0.
+
+        self._posted_signal.connect(self._deliver, QtCore.Qt.QueuedConnection)
+
+    @property
+    def depth(self):
+        """Number of queued frames."""
+        return len(self._frames)
+
+    def set_enabled(self, enabled):
+        """Enable or disable recording, whereby queued frames are discarded and a blocked worker is released when
+        disabled.
+        """
+        with self._lock:
+            self.enabled = enabled
+            if not enabled:
+                self._frames.clear()
+                self._not_full.notify_all()
+
+    def post(self, frame):
+        """Post frame from worker thread, if recording is enabled, whereby it blocks while the queue is full."""
+        if not self.enabled:
+            return
+        with self._lock:
+            if len(self._frames) >= self.maxlen:
+                self.stalls += 1
+                start = perf_counter()
+                while self.enabled and len(self._frames) >= self.maxlen:
+                    self._not_full.wait()
+                self.stall_seconds += perf_counter() - start
+            if not self.enabled:  # Disabled while blocked
+                return
+            self._frames.append((frame, perf_counter()))
+            self.posted += 1
+            notify = not self._notify_pending
+            self._notify_pending = True
+
+        # Only one notification is queued in the event loop at any time
+        if notify:
+            self._posted_signal.emit()
+
+    def _deliver(self):
+        """Slot for delivering all queued frames to recording consumers."""
+        with self._lock:
+            self._notify_pending = False
+        while True:
+            with self._lock:
+                if len(self._frames) == 0:
+                    return
+                frame, post_time = self._frames.popleft()
+                self._not_full.notify()
+                self.delivered += 1
+                self.lag = perf_counter() - post_time
+                self.max_lag = max(self.max_lag, self.lag)
+
+            self.new_data_signal.emit(frame)
+
+
+class FrameRingBuffer:
+    """Fixed-size ring buffer of the last frames, preallocated by the first frame."""
+    def __init__(self, length):
+        """Initialize ring buffer."""
+        self.length = length
+        self.fields = None
+        self.idx = 0
+        self.count = 0
+        self._lock = Lock()
+
+    def write(self, **kwargs):
+        """Write frame given by fields (scalars or arrays of constant shape)."""
+        with self._lock:
+            if self.fields is None:
+                self.fields = {
+                    key: np.full((self.length,) + np.shape(value), np.nan, dtype=np.result_type(value, float))
+                    for key, value in kwargs.items()
+                }
+            for key, value in kwargs.items():
+                self.fields[key][self.idx] = value
+            self.idx = (self.idx + 1) % self.length
+            self.count = min(self.count + 1, self.length)
+
+    def snapshot(self):
+        """Get copy of the buffered frames, ordered from oldest to newest."""
+        with self._lock:
+            if self.fields is None:
+                return {}
+            order = (np.arange(self.count) + self.idx - self.count) % self.length
+            return {key: value[order] for key, value in self.fields.items()}
 
 
 class BackgroundProcess(QtCore.QObject):
     """Background process for user interface."""
-    # Signals from worker
-    new_data_signal = QtCore.pyqtSignal(object)
+    # Signals from worker (use mailbox for display, and recorder for recording of every frame)
     radar_initialized_signal = QtCore.pyqtSignal()
+    reevaluation_finished_signal = QtCore.pyqtSignal(object)
+    rf_path_calibration_progress_signal = QtCore.pyqtSignal(int, int, float)  # Frames, total frames, std error (dB)
+    rf_path_calibration_finished_signal = QtCore.pyqtSignal()
 
     # Signals to worker
     set_proc_attribute_signal = QtCore.pyqtSignal(str, object)
@@ -21,8 +320,14 @@ class BackgroundProcess(QtCore.QObject):
     # Set offset on RTT, i.e., to properly correct PPV and as an initial value for the distance origin
     # rtt_offset = 500E-12
 
-    def __init__(self, radar_serial_number=None, atm_sensor_comport=None, co2_sensor_comport=None):
-        """Initialize background process."""
+    def __init__(self, radar_serial_number=None, atm_sensor_comport=None, co2_sensor_comport=None,
+                 if_buffer_length=100, record_queue_length=1000, simulator=None, shared_memory_name=None,
+                 shared_memory_slots=64):
+        """Initialize background process, using a RadarSimulator instead of the devices if given.
+
+        If shared_memory_name is given, raw and processed data of each frame are published into a shared-memory ring
+        of that name for other local processes (see SharedFrameReader).
+        """
         super().__init__()
 
         # Init worker thread
@@ -31,6 +336,12 @@ class BackgroundProcess(QtCore.QObject):
         self.thread.started.connect(self.worker)
         self.is_running = False
 
+        # Latest-frame mailbox for display consumers (lives in the GUI thread)
+        self.mailbox = LatestFrameMailbox()
+
+        # Bounded queue of every frame for recording consumers (lives in the GUI thread)
+        self.recorder = RecordingQueue(maxlen=record_queue_length)
+
         # Slots from worker thread
         self.set_proc_attribute_signal.connect(
             lambda attribute_name, attribute_value: setattr(self._proc, attribute_name, attribute_value)
@@ -39,8 +350,10 @@ class BackgroundProcess(QtCore.QObject):
             lambda method_name, kwargs: getattr(self._proc, method_name)(**kwargs)
         )
 
-        # Devices
-        radar_devices = SenseX1000.find_devices()
+        # Devices (real or simulated)
+        self.radar_class = SenseX1000 if simulator is None else simulator
+        self.open_sensor = dracalvcp.Device if simulator is None else simulator.open_sensor
+        radar_devices = self.radar_class.find_devices()
         if len(radar_devices) < 1:
             raise Exception('No Sense X1000 devices found')
 
@@ -61,6 +374,30 @@ class BackgroundProcess(QtCore.QObject):
 
         # Processor
         self._proc = None
+        self.roi = None
+
+        # Multi-target detector, disabled if None
+        self.detector = None
+
+        # Retained IF data, and atmospheric data for re-evaluation
+        self.if_buffer = FrameRingBuffer(if_buffer_length)
+        self._reevaluation_requested = False
+        self._reevaluation_active = False  # From request until result is emitted
+
+        # Number of frames of requested RF path calibration, None if not requested
+        self._rf_path_calibration_requested = None
+
+        # Distance history of the session for level-of-detail views
+        self.distance_history = MinMaxPyramid()
+
+        # Operational metrics of the processing loop
+        self.metrics = LoopMetrics()
+
+        # Shared-memory frame ring for other local processes, disabled if None
+        if shared_memory_name is not None:
+            self.shared_frames = SharedFrameRing(shared_memory_name, shared_memory_slots)
+        else:
+            self.shared_frames = None
 
     def _set_proc_attribute(self, attribute_name, attribute_value):
         """Slot for threadsafe set of processor attribute."""
@@ -76,6 +413,7 @@ class BackgroundProcess(QtCore.QObject):
 
     def stop(self):
         self.is_running = False
+        self.recorder.set_enabled(False)  # Release worker blocked by recording
         self.thread.quit()
         self.thread.wait()
 
@@ -92,8 +430,13 @@ class BackgroundProcess(QtCore.QObject):
     def set_roi(self, roi):
         """Set ROI."""
         if self._proc is not None:
+            self.roi = roi
             self.set_proc_attribute_signal.emit('roi', roi)
 
+    def set_multi_target(self, max_targets, **kwargs):
+        """Set multi-target detection with max_targets per sweep, whereby 0 disables detection."""
+        self.detector = MultiTargetDetector(max_targets=max_targets, **kwargs) if max_targets > 0 else None
+
     def set_nfc_none(self):
         """Disable near-field correction."""
         if self._proc is not None:
@@ -128,6 +471,15 @@ class BackgroundProcess(QtCore.QObject):
         if self._proc is not None:
             self.call_proc_method_signal.emit('do_rf_path_calibration', {})
 
+    def start_rf_path_calibration(self, n_frames):
+        """Start RF path calibration, averaging the RF path response over n_frames frames.
+
+        The response is accumulated by the worker with a copy of the processor, and loaded into the processor between
+        two frames when finished. Progress is emitted by rf_path_calibration_progress_signal.
+        """
+        if self._proc is not None:
+            self._rf_path_calibration_requested = n_frames
+
     def get_rf_path_response(self):
         """Get RF path response."""
         if self._proc is not None:
@@ -138,70 +490,73 @@ class BackgroundProcess(QtCore.QObject):
         if self._proc is not None:
             self.call_proc_method_signal.emit('load_rf_path_response', {'freq': freq, 'response': response})
 
+    def reevaluate_buffer(self):
+        """Re-evaluate retained IF data with current processor settings in background.
+
+        The processor is copied by the worker between two frames, and the result (or error) is emitted by
+        reevaluation_finished_signal. Returns False if rejected, i.e., if a re-evaluation is already active.
+        """
+        if self._proc is None or self._reevaluation_active:
+            return False
+        self._reevaluation_active = True
+        self._reevaluation_requested = True
+        return True
+
+    def _reevaluate(self, proc, frames):
+        """Re-evaluate frames by processor (runs in separate thread)."""
+        try:
+            distance = []
+            for idx in range(len(frames['if_data'])):
+                proc.update_if_data(frames['if_data'][idx])
+                temp_data, press_data, hum_data, co2_data = (
+                    None if np.isnan(frames[key][idx]) else frames[key][idx]
+                    for key in ('temp', 'press', 'hum', 'co2')
+                )
+                proc.update_atmospheric_data(
+                    temp_data + 273.15 if temp_data is not None else None,
+                    press_data,
+                    hum_data,
+                    co2_data * 1E-6 if co2_data is not None else None
+                )
+                distance.append(np.copy(proc.distance))
+            result = {
+                'old_distance': frames['distance'],
+                'new_distance': np.asarray(distance)
+            }
+        except Exception as error:
+            result = {'error': repr(error)}
+
+        self._reevaluation_active = False
+        self.reevaluation_finished_signal.emit(result)
+
     def worker(self):
         """Start main loop of background process."""
         with ExitStack() as stack:
             # Conditional opening of devices
-            radar_device = stack.enter_context(SenseX1000.open_device(self.radar_device))
+            radar_device = stack.enter_context(self.radar_class.open_device(self.radar_device))
 
             if self.atm_sensor_comport is not None:
-                atm_sensor_device = stack.enter_context(dracalvcp.Device(self.atm_sensor_comport))
+                atm_sensor_device = stack.enter_context(self.open_sensor(self.atm_sensor_comport))
             else:
                 atm_sensor_device = None
 
             if self.co2_sensor_comport is not None:
-                co2_sensor_device = stack.enter_context(dracalvcp.Device(self.co2_sensor_comport))
+                co2_sensor_device = stack.enter_context(self.open_sensor(self.co2_sensor_comport))
             else:
                 co2_sensor_device = None
 
-            # Recall preset and clear registers
-            radar_device.core.rst()
-            radar_device.core.cls()
+            if self.shared_frames is not None:
+                stack.callback(self.shared_frames.close)
 
             # Configure radar
-            radar_device.sense.frequency_start(182E9)
-            radar_device.sense.frequency_stop(126E9)
-            radar_device.sense.sweep_time(2E-3)
-            radar_device.sense.sweep_count(2 * 3)
-            radar_device.sense.sweep_period(10E-3)
-            radar_device.sense.sweep_mode(getattr(SenseX1000.SweepMode, 'ALTERNATING'))
-            radar_device.calc.trace_list([0])  # Centered channel
-            radar_device.control.accessory_enable(False)  # Disable LED
-            self._radar_config = radar_device.sense.dump()  # Dump radar configuration
-
-            # Update effective center frequency
-            self._radar_config['FREQUENCY']['CENTER'] = 154007370664
+            self._radar_config = configure_radar(radar_device, self.radar_class.SweepMode)
 
             # Init ranging processor
-            if_data_order = {
-                True: 'ud',
-                False: 'du'
-            }[self._radar_config['FREQUENCY']['STOP'] > self._radar_config['FREQUENCY']['START']]
-
-            self._proc = mmwranging.Processor(
-                self._radar_config['FREQUENCY']['CENTER'],
-                abs(self._radar_config['FREQUENCY']['STOP'] - self._radar_config['FREQUENCY']['START']),
-                self._radar_config['SWEEP']['TIME'],
-                self._radar_config['SWEEP']['POINTS'],
-                td_length=self._radar_config['SWEEP']['POINTS'] * 1,
-                use_triangular_modulation=True,
-                use_phase=True,
-                if_data_order=if_data_order,
-                estimator='QIPS',
-                window='hann',
-                refractive_index_model='dband' if atm_sensor_device is not None else None,  # Use C0 if no atm device
-                if_path_filter='phase',
-                nearfield_correction=None
+            self._proc = create_processor(
+                self._radar_config,
+                refractive_index_model='dband' if atm_sensor_device is not None else None  # Use C0 if no atm device
             )
 
-            # Load default signal calibration (RF-path frequency response)
-            data = np.load('./calibration/rf_path_2piSENSE.npz')
-            self._proc.load_rf_path_response(data['freq'], data['response'])
-
-            # Load default IF-path frequency response
-            data = np.genfromtxt('./calibration/if_path_sim_2piSENSE.txt', delimiter=',', skip_header=1).T
-            self._proc.load_if_path_response(data[0], 10 ** (data[1] / 20) * np.exp(1j * data[2] / 180 * np.pi))
-
             # Set initial origin
             # self._proc.origin = -self.rtt_offset * mmwranging.C0 / 2
 
@@ -209,15 +564,37 @@ class BackgroundProcess(QtCore.QObject):
             self.radar_initialized_signal.emit()
 
             # Processing loop
+            calibration_proc = calibration_statistics = None
             self.is_running = True
             while self.is_running:
+                loop_start = perf_counter()
+
+                # Start re-evaluation of retained frames by a copy of the processor
+                if self._reevaluation_requested:
+                    self._reevaluation_requested = False
+                    frames = self.if_buffer.snapshot()
+                    if len(frames) > 0:
+                        Thread(target=self._reevaluate, args=(deepcopy(self._proc), frames), daemon=True).start()
+                    else:
+                        self._reevaluation_active = False
+                        self.reevaluation_finished_signal.emit({'error': 'No frames retained'})
+
+                # Start RF path calibration by a copy of the processor
+                if self._rf_path_calibration_requested is not None:
+                    calibration_frames = self._rf_path_calibration_requested
+                    self._rf_path_calibration_requested = None
+                    calibration_proc = deepcopy(self._proc)
+                    calibration_statistics = RunningComplexStatistics()
+
                 # Read data from radar
                 try:
                     acq = radar_device.initiate.immediate_and_receive()  # Initiate initial data (non-blocking)
                     data = acq.read()  # Blocking
                 except UsbTmcTimeoutException:
                     warn('USB TMC timeout')
+                    self.metrics.usb_timeouts += 1
                     continue
+                processing_start = perf_counter()
 
                 # Push IF data into processor
                 if_data = data.array[:, 0, :]  # [#Sweep, #Trace, #Sample]
@@ -225,17 +602,23 @@ class BackgroundProcess(QtCore.QObject):
                 self._proc.update_if_data(if_data)
 
                 # Push atmospheric data into processor
+                temp_data = press_data = hum_data = co2_data = None
                 if atm_sensor_device is not None:
-                    temp_data = atm_sensor_device.get_temp()
-                    press_data = atm_sensor_device.get_press()
-                    hum_data = atm_sensor_device.get_hum()
-                else:
-                    temp_data = press_data = hum_data = None
+                    try:
+                        temp_data = atm_sensor_device.get_temp()
+                        press_data = atm_sensor_device.get_press()
+                        hum_data = atm_sensor_device.get_hum()
+                    except Exception as error:  # Continue without atmospheric data of this frame
+                        warn('Reading atmospheric sensor failed: %s' % error)
+                        self.metrics.sensor_read_failures['atm'] += 1
+                        temp_data = press_data = hum_data = None
 
                 if co2_sensor_device is not None:
-                    co2_data = co2_sensor_device.get_co2()
-                else:
-                    co2_data = None
+                    try:
+                        co2_data = co2_sensor_device.get_co2()
+                    except Exception as error:
+                        warn('Reading CO2 sensor failed: %s' % error)
+                        self.metrics.sensor_read_failures['co2'] += 1
 
                 self._proc.update_atmospheric_data(
                     temp_data + 273.15 if temp_data is not None else None,
@@ -244,18 +627,80 @@ class BackgroundProcess(QtCore.QObject):
                     co2_data * 1E-6 if co2_data is not None else None
                 )
 
+                # Accumulate RF path response of this frame, i.e., arm calibration which captures the next frame
+                if calibration_proc is not None:
+                    calibration_proc.do_rf_path_calibration()
+                    calibration_proc.update_if_data(if_data)
+                    calibration_statistics.update(calibration_proc.rf_path_response)
+                    self.rf_path_calibration_progress_signal.emit(
+                        calibration_statistics.count, calibration_frames,
+                        calibration_statistics.relative_standard_error_db()
+                    )
+                    if calibration_statistics.count >= calibration_frames:
+                        # Load averaged response between two frames
+                        self._proc.load_rf_path_response(
+                            freq=calibration_proc.freq_axis, response=calibration_statistics.mean
+                        )
+                        calibration_proc = calibration_statistics = None
+                        self.rf_path_calibration_finished_signal.emit()
+
+                # Retain frame for re-evaluation
+                self.if_buffer.write(
+                    if_data=if_data,
+                    temp=np.nan if temp_data is None else temp_data,
+                    press=np.nan if press_data is None else press_data,
+                    hum=np.nan if hum_data is None else hum_data,
+                    co2=np.nan if co2_data is None else co2_data,
+                    distance=self._proc.distance
+                )
+
+                # Append distance to history
+                self.distance_history.append(self._proc.distance)
+
+                # Multi-target detection, whereby ranges are converted to distances by origin and direction of the
+                # processor (without near-field correction)
+                detector = self.detector
+                if detector is not None:
+                    target_range, target_snr_db, target_power_db = detector.detect(
+                        self._proc.td_data_db, self._proc.time_axis, roi=self.roi,
+                        refractive_index=np.mean(self._proc.refractive_index)
+                    )
+                    sign = -1 if self._proc.direction == 'negative' else 1
+                    target_distance = sign * (target_range - self._proc.origin)
+                else:
+                    target_distance = target_snr_db = target_power_db = None
+
                 # Emit signals of raw and processed data
-                self.new_data_signal.emit({
-                    'if_data': if_data,
-                    'time_axis': self._proc.time_axis,
-                    'td_data_db': self._proc.td_data_db,
-                    'distance': self._proc.distance,
-                    'snr_db': self._proc.snr_db,
-                    'power_db': self._proc.power_db,
-                    'refractive_index': self._proc.refractive_index,
-                    'temp': temp_data,
-                    'press': press_data,
-                    'hum': hum_data,
-                    'co2': co2_data
-                })
+                frame = FrameRecord(
+                    if_data,
+                    self._proc.time_axis,
+                    self._proc.td_data_db,
+                    self._proc.distance,
+                    self._proc.snr_db,
+                    self._proc.power_db,
+                    self._proc.refractive_index,
+                    target_distance=target_distance,
+                    target_snr_db=target_snr_db,
+                    target_power_db=target_power_db,
+                    temp=temp_data,
+                    press=press_data,
+                    hum=hum_data,
+                    co2=co2_data
+                )
+                self.recorder.post(frame)
+                self.mailbox.post(frame)
+
+                # Publish frame to other local processes
+                if self.shared_frames is not None:
+                    self.shared_frames.publish(
+                        if_data=frame.if_data,
+                        time_axis=frame.time_axis,
+                        td_data_db=frame.td_data_db,
+                        distance=frame.distance,
+                        snr_db=frame.snr_db,
+                        power_db=frame.power_db,
+                        refractive_index=frame.refractive_index
+                    )
+
+                self.metrics.record_frame(loop_start, processing_start, perf_counter())
 
@@ -0,0 +1,132 @@
+import numpy as np
+import itertools
+import tracemalloc
+from time import perf_counter
+from .background_process import configure_radar, create_processor
+from .misc import load_raw_data
+from .nfc import load_nfc_lookup_tables
+from .simulator import RadarSimulator
+
+
+def load_dataset(filename):
+    """Load IF data [#Series, #Frame, #Sweep, #Sample] and radar configuration from a raw data file."""
+    data = load_raw_data(filename)
+    return data['if_data'], data['radar_config'].item()
+
+
+def simulate_dataset(n_frames, simulator=None):
+    """Simulate IF data [#Series, #Frame, #Sweep, #Sample] of a single series, and radar configuration of a static
+    scene.
+    """
+    simulator = simulator if simulator is not None else RadarSimulator(realtime=False, seed=0)
+    with simulator.open_device(None) as radar_device:
+        radar_config = configure_radar(radar_device, simulator.SweepMode)
+        if_data = np.asarray([
+            radar_device.initiate.immediate_and_receive().read().array[:, 0, :] for _ in range(n_frames)
+        ])
+    return if_data[np.newaxis] / (2 ** (8 * simulator.data_size - 1)), radar_config
+
+
+def nfc_settings(mode, d1=0., d2=0., a_tot=0., r_off=0., func_filename=None):
+    """Get near-field correction setting of the processor for mode None, 'AM2', 'PM' or 'func'."""
+    if mode is None or mode == 'none':
+        return None
+    elif mode == 'AM2':
+        return {'mode': 'AM2', 'd1': d1, 'd2': d2, 'rtt_offset': 500E-12}
+    elif mode == 'PM':
+        return {'mode': 'PM', 'a_tot': a_tot, 'r_off': r_off}
+    elif mode == 'func':
+        pulse_position_variation_func, pulse_phase_variation_func = load_nfc_lookup_tables(func_filename)
+        return {'mode': 'func',
+                'pulse_position_variation_func': pulse_position_variation_func,
+                'pulse_phase_variation_func': pulse_phase_variation_func}
+    raise ValueError('Unknown near-field correction mode: %s' % mode)
+
+
+def benchmark_processor(if_data, radar_config, nearfield_correction=None, roi=None, **options):
+    """Process IF data [#Series, #Frame, #Sweep, #Sample] by a processor with options.
+
+    Returns time per frame (s), peak memory allocated while processing (B), and standard deviation of distance (m).
+    The standard deviation is computed per series (i.e., per position of the target), and pooled as RMS over the series
+    weighted by their number of distances. The first frame is excluded from timing and statistics (warm-up). Time and
+    memory are measured in separate passes, since tracing of memory allocations slows down processing.
+    """
+    proc = create_processor(radar_config, **options)
+    proc.nearfield_correction = nearfield_correction
+    if roi is not None:
+        proc.roi = roi
+
+    proc.update_if_data(if_data[0][0])
+    proc.update_atmospheric_data(None, None, None, None)
+    n_frames = sum(len(series) for series in if_data) - 1
+
+    def process():
+        distance = []
+        for idx, series in enumerate(if_data):
+            distance.append([])
+            for frame in series[1:] if idx == 0 else series:
+                proc.update_if_data(frame)
+                proc.update_atmospheric_data(None, None, None, None)
+                distance[-1].append(np.copy(proc.distance))
+        return distance
+
+    # Timing pass
+    start = perf_counter()
+    distance = process()
+    stop = perf_counter()
+
+    # Memory pass
+    tracemalloc.start()
+    process()
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'time_per_frame': (stop - start) / n_frames,
+        'peak_memory': peak_memory,
+        'distance_std': pooled_std(distance)
+    }
+
+
+def pooled_std(series):
+    """Get pooled standard deviation (RMS of the standard deviations weighted by counts) of series of values,
+    whereby NaN values are ignored.
+    """
+    counts, variances = [], []
+    for values in series:
+        values = np.ravel(np.asarray(values, dtype=float))
+        values = values[~np.isnan(values)]
+        if len(values) > 0:
+            counts.append(len(values))
+            variances.append(np.var(values))
+    if len(counts) == 0:
+        return np.nan
+    return np.sqrt(np.average(variances, weights=counts))
+
+
+def benchmark_matrix(if_data, radar_config, estimators=('QIPS',), windows=('hann',), td_length_factors=(1,),
+                     if_path_filters=('phase',), use_phase=(True,), nfc_modes=('none',), nfc_params=None, roi=None):
+    """Benchmark all combinations of processor options, yielding the options and results of each combination.
+
+    Failing combinations (e.g., options not supported by the processor) yield the error instead of results.
+    """
+    for estimator, window, td_length_factor, if_path_filter, use_phase_, nfc_mode in itertools.product(
+            estimators, windows, td_length_factors, if_path_filters, use_phase, nfc_modes):
+        options = {
+            'estimator': estimator,
+            'window': window,
+            'td_length': radar_config['SWEEP']['POINTS'] * td_length_factor,
+            'if_path_filter': if_path_filter,
+            'use_phase': use_phase_
+        }
+        try:
+            results = benchmark_processor(
+                if_data, radar_config,
+                nearfield_correction=nfc_settings(nfc_mode, **(nfc_params or {})),
+                roi=roi,
+                **options
+            )
+        except Exception as error:
+            results = {'error': repr(error)}
+        options['nfc'] = nfc_mode
+        yield options, results
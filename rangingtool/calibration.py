@@ -1,10 +1,10 @@
-from PyQt5 import QtWidgets, QtCore, uic
+from PyQt5 import QtWidgets, uic
 import numpy as np
 from pkg_resources import resource_filename
 
 
 class SignalCalibrationWindow(QtWidgets.QWidget):
-    def __init__(self, background_process, *args, **kwargs):
+    def __init__(self, background_process, render_scheduler, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
         # Initialize appearance of the UI
@@ -12,20 +12,23 @@ class SignalCalibrationWindow(QtWidgets.QWidget):
 
         # Declare Variables
         self.background_process = background_process
+        self.render_scheduler = render_scheduler
         self.zp_order = 10  # Order of zero-padding
         self.freq = None
         self.freq_response = None
 
-        # Update measured data timer
-        self.update_plot_timer = QtCore.QTimer()
-        self.update_plot_timer.timeout.connect(self.update_plot)
-        self.update_plot_timer.start(1000)
+        # Register at render clock (polling of RF path response)
+        self.render_scheduler.register(self, self.update_plot, poll_interval=1)
 
         # Signals
         self.btn_do_calibration.clicked.connect(self.btn_do_calibration_clicked)
         self.btn_load_calibration.clicked.connect(self.btn_load_calibration_clicked)
         self.btn_save_calibration.clicked.connect(self.btn_save_calibration_clicked)
 
+        # Slots to background process
+        self.background_process.rf_path_calibration_progress_signal.connect(self.calibration_progress)
+        self.background_process.rf_path_calibration_finished_signal.connect(self.calibration_finished)
+
         # Setup plot widget
         self.curve = self.plt_calibration.plot()
         self.plt_calibration.getAxis('left').setLabel('Normalized Impulse Response (dB)')
@@ -34,13 +37,25 @@ class SignalCalibrationWindow(QtWidgets.QWidget):
         self.plt_calibration.setYRange(-40, 0)
 
     def closeEvent(self, event):
-        # Stop timer
-        self.update_plot_timer.stop()
+        # Unregister from render clock & Disconnect calibration signals
+        self.render_scheduler.unregister(self)
+        self.background_process.rf_path_calibration_progress_signal.disconnect(self.calibration_progress)
+        self.background_process.rf_path_calibration_finished_signal.disconnect(self.calibration_finished)
 
         event.accept()
 
     def btn_do_calibration_clicked(self):
-        self.background_process.do_rf_path_calibration()
+        self.pbar_calibration.setValue(0)
+        self.background_process.start_rf_path_calibration(self.sb_calibration_frames.value())
+
+    def calibration_progress(self, count, total, std_error_db):
+        """Slot for progress of RF path calibration, with standard error of the averaged response as convergence."""
+        self.pbar_calibration.setValue(int(100 * count / total))
+        if not np.isnan(std_error_db):
+            self.label_calibration_error.setText('Std. error: %.1f dB' % std_error_db)
+
+    def calibration_finished(self):
+        self.pbar_calibration.setValue(100)
 
     def btn_load_calibration_clicked(self):
         filename, _ = QtWidgets.QFileDialog.getOpenFileName(self, 'Load File', filter='Numpy files (*.npz)')
@@ -59,6 +74,8 @@ class SignalCalibrationWindow(QtWidgets.QWidget):
         """Slot to timer for updating user interface with measured data."""
         # Fetch rf path response from background process
         data = self.background_process.get_rf_path_response()
+        if data is None:  # Radar not yet initialized
+            return
         self.freq = data['freq']
         self.freq_response = data['response']
 
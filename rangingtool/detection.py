@@ -0,0 +1,146 @@
+import numpy as np
+from scipy.constants import c as C0
+
+
+class MultiTargetDetector:
+    """Vectorized multi-target detector operating on the echo profiles of all sweeps of a frame."""
+    def __init__(self, max_targets=4, guard_cells=4, training_cells=16, threshold_db=12.):
+        """Initialize detector.
+
+        The noise floor is estimated by cell-averaging CFAR, i.e., by the mean power of training_cells on both sides of
+        the cell under test, separated by guard_cells. Local maxima exceeding the noise floor by threshold_db are
+        detected, and the max_targets strongest detections per sweep are refined by parabolic interpolation.
+        """
+        self.max_targets = max_targets
+        self.guard_cells = guard_cells
+        self.training_cells = training_cells
+        self.threshold_db = threshold_db
+
+    def detect(self, td_data_db, time_axis, roi=None, refractive_index=1.):
+        """Detect targets in echo profiles td_data_db [#Sweep, #Sample].
+
+        Returns arrays of range (m), SNR (dB) and power (dB) of shape [#Sweep, max_targets], whereby the targets of
+        each sweep are sorted by range, and missing targets are NaN. The range is derived from the round-trip time and
+        refractive_index, i.e., origin and direction of the processor are not applied (see BackgroundProcess).
+        """
+        td_data_db = np.atleast_2d(td_data_db)
+        n_sweeps, n_samples = td_data_db.shape
+        n_half = len(time_axis) // 2  # Positive time axis
+        g, t, k = self.guard_cells, self.training_cells, self.max_targets
+
+        # Cell-averaging noise floor by cumulative sums, computed for all sweeps at once
+        power = 10 ** (td_data_db[:, :n_half] / 10)
+        padded = np.pad(power, ((0, 0), (g + t, g + t + 1)), mode='edge')
+        cumsum = np.concatenate((np.zeros((n_sweeps, 1)), np.cumsum(padded, axis=1)), axis=1)
+        idx = np.arange(n_half) + g + t
+        lagging = cumsum[:, idx - g] - cumsum[:, idx - g - t]
+        leading = cumsum[:, idx + g + t + 1] - cumsum[:, idx + g + 1]
+        noise_db = 10 * np.log10((lagging + leading) / (2 * t))
+        snr_db = td_data_db[:, :n_half] - noise_db
+
+        # Local maxima exceeding the threshold within the ROI
+        y = td_data_db[:, :n_half]
+        is_peak = np.zeros_like(y, dtype=bool)
+        is_peak[:, 1:-1] = (y[:, 1:-1] > y[:, :-2]) & (y[:, 1:-1] >= y[:, 2:])
+        is_peak &= snr_db > self.threshold_db
+        if roi is not None:
+            is_peak &= (time_axis[:n_half] >= roi[0]) & (time_axis[:n_half] <= roi[1])
+
+        # Strongest k peaks per sweep
+        score = np.where(is_peak, y, -np.inf)
+        if k < n_half:
+            peak_idx = np.argpartition(-score, k - 1, axis=1)[:, :k]
+        else:
+            peak_idx = np.broadcast_to(np.arange(n_half), (n_sweeps, n_half))
+        rows = np.arange(n_sweeps)[:, np.newaxis]
+        valid = np.isfinite(score[rows, peak_idx])
+        peak_idx = np.clip(peak_idx, 1, n_half - 2)
+
+        # Sub-bin refinement by parabolic interpolation
+        a, b, c = y[rows, peak_idx - 1], y[rows, peak_idx], y[rows, peak_idx + 1]
+        denominator = a - 2 * b + c
+        with np.errstate(divide='ignore', invalid='ignore'):
+            delta = np.where(denominator != 0, 0.5 * (a - c) / denominator, 0)
+        delta = np.clip(delta, -0.5, 0.5)
+        power_db = b - 0.25 * (a - c) * delta
+        dt = time_axis[1] - time_axis[0]
+        range_ = (time_axis[0] + (peak_idx + delta) * dt) * C0 / (2 * refractive_index)
+        snr_db = power_db - noise_db[rows, peak_idx]
+
+        # Mask missing targets, and sort by range
+        range_ = np.where(valid, range_, np.nan)
+        snr_db = np.where(valid, snr_db, np.nan)
+        power_db = np.where(valid, power_db, np.nan)
+        order = np.argsort(np.where(valid, range_, np.inf), axis=1)
+
+        return range_[rows, order], snr_db[rows, order], power_db[rows, order]
+
+
+class TargetAssociation:
+    """Association of detections of a measurement series to targets, with their statistics in constant memory.
+
+    Detections are accumulated in distance bins of bin_width (m), and adjacent occupied bins are merged to one target,
+    i.e., a target is identified by its distance over all sweeps instead of by its index within each sweep. Targets
+    detected in less than min_rate of the sweeps (e.g., noise) are discarded.
+    """
+    def __init__(self, bin_width=1E-3, min_rate=0.5):
+        """Initialize association."""
+        self.bin_width = bin_width
+        self.min_rate = min_rate
+        self.sweeps = 0
+        # Sums per bin: count, distance offset from bin and its square, SNR and its square, power and its square
+        self._bins = {}
+
+    def update(self, distance, snr_db, power_db):
+        """Add detections of a frame, given as arrays of shape [#Sweep, #Target] with NaN for missing targets."""
+        self.sweeps += np.atleast_2d(distance).shape[0]
+        distance, snr_db, power_db = (np.ravel(value) for value in (distance, snr_db, power_db))
+        valid = np.isfinite(distance)
+        distance, snr_db, power_db = distance[valid], snr_db[valid], power_db[valid]
+        bins = np.floor(distance / self.bin_width).astype(np.int64)
+        offset = distance - bins * self.bin_width
+        for bin_ in np.unique(bins):
+            mask = bins == bin_
+            sums = np.asarray([
+                np.count_nonzero(mask),
+                np.sum(offset[mask]), np.sum(offset[mask] ** 2),
+                np.sum(snr_db[mask]), np.sum(snr_db[mask] ** 2),
+                np.sum(power_db[mask]), np.sum(power_db[mask] ** 2)
+            ])
+            if bin_ in self._bins:
+                self._bins[bin_] += sums
+            else:
+                self._bins[bin_] = sums
+
+    def _clusters(self):
+        """Get sums of the clusters of adjacent bins, with the offset of the distance relative to the first bin."""
+        clusters = []
+        for bin_ in sorted(self._bins):
+            count, offset, offset2, *sums = self._bins[bin_]
+            if len(clusters) > 0 and bin_ == clusters[-1][0] + clusters[-1][1]:
+                shift = clusters[-1][1] * self.bin_width  # Refer offset to first bin of cluster
+                clusters[-1][1] += 1
+                clusters[-1][2] += np.asarray(
+                    [count, offset + count * shift, offset2 + 2 * shift * offset + count * shift ** 2] + sums
+                )
+            else:
+                clusters.append([bin_, 1, np.asarray([count, offset, offset2] + sums)])
+        return clusters
+
+    def targets(self):
+        """Get dict of arrays of the targets sorted by distance, i.e., mean and std of distance, SNR and power, and
+        rate.
+        """
+        keys = ['distance', 'distance_std', 'snr', 'snr_std', 'power', 'power_std', 'rate']
+        data = {key: [] for key in keys}
+        for bin_, _, (count, offset, offset2, snr, snr2, power, power2) in self._clusters():
+            if count < self.min_rate * self.sweeps:
+                continue
+            for key, value, value2, reference in [
+                ('distance', offset, offset2, bin_ * self.bin_width), ('snr', snr, snr2, 0), ('power', power, power2, 0)
+            ]:
+                mean = value / count
+                data[key].append(reference + mean)
+                data[key + '_std'].append(np.sqrt(max(value2 / count - mean ** 2, 0)))
+            data['rate'].append(count / self.sweeps)
+        return {key: np.asarray(value) for key, value in data.items()}
@@ -1,9 +1,9 @@
-from PyQt5 import QtWidgets, QtCore, uic
+from PyQt5 import QtWidgets, uic
 from pkg_resources import resource_filename
 
 
 class EchoPlotWindow(QtWidgets.QWidget):
-    def __init__(self, background_process, *args, **kwargs):
+    def __init__(self, background_process, render_scheduler, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
         # Initialize appearance of the UI
@@ -11,16 +11,15 @@ class EchoPlotWindow(QtWidgets.QWidget):
 
         # Declare Variables
         self.background_process = background_process
+        self.render_scheduler = render_scheduler
         self.time_axis = None
         self.td_data = None
 
-        # Update measured data timer
-        self.update_measured_data_timer = QtCore.QTimer()
-        self.update_measured_data_timer.timeout.connect(self.update_measured_data)
-        self.update_measured_data_timer.start(100)
+        # Register at render clock
+        self.render_scheduler.register(self, self.update_measured_data)
 
         # Slots to background process
-        self.background_process.new_data_signal.connect(self.new_data)
+        self.background_process.mailbox.new_data_signal.connect(self.new_data)
 
         # Setup plot widget
         self.curve = self.plt_echo.plot()
@@ -28,16 +27,17 @@ class EchoPlotWindow(QtWidgets.QWidget):
         self.plt_echo.getAxis('bottom').setLabel('Distance (m)')
 
     def closeEvent(self, event):
-        # Stop timer & Disconnect new data signal
-        self.update_measured_data_timer.stop()
-        self.background_process.new_data_signal.disconnect(self.new_data)
+        # Unregister from render clock & Disconnect new data signal
+        self.render_scheduler.unregister(self)
+        self.background_process.mailbox.new_data_signal.disconnect(self.new_data)
 
         event.accept()
 
     def new_data(self, value):
         """Slot for incoming data."""
-        self.time_axis = value['time_axis']
-        self.td_data = value['td_data_db'][0]  # first sweep
+        self.time_axis = value.time_axis
+        self.td_data = value.td_data_db[0]  # first sweep
+        self.render_scheduler.mark_dirty(self)
 
     def update_measured_data(self):
         """Slot to timer for updating user interface with measured data."""
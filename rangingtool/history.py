@@ -1,10 +1,10 @@
-from PyQt5 import QtWidgets, QtCore, uic
-import numpy as np
+from PyQt5 import QtWidgets, uic
+import pyqtgraph as pg
 from pkg_resources import resource_filename
 
 
 class HistoryPlotWindow(QtWidgets.QWidget):
-    def __init__(self, background_process, *args, **kwargs):
+    def __init__(self, background_process, render_scheduler, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
         # Initialize appearance of the UI
@@ -12,58 +12,75 @@ class HistoryPlotWindow(QtWidgets.QWidget):
 
         # Declare Variables
         self.background_process = background_process
-        self.distance = None
+        self.render_scheduler = render_scheduler
+        self.distance_history = background_process.distance_history  # Maintained by the worker
         self.window_length = None
-        self.distance_mem = None
+        self._setting_range = False
 
-        # Update measured data timer
-        self.update_measured_data_timer = QtCore.QTimer()
-        self.update_measured_data_timer.timeout.connect(self.update_measured_data)
-        self.update_measured_data_timer.start(100)
+        # Register at render clock
+        self.render_scheduler.register(self, self.update_measured_data)
 
         # Signals
         self.sb_window_length.valueChanged.connect(self.sb_window_length_changed)
+        self.cbox_follow.clicked.connect(lambda _: self.render_scheduler.mark_dirty(self))
 
         # Slots to background process
-        self.background_process.new_data_signal.connect(self.new_data)
+        self.background_process.mailbox.new_data_signal.connect(self.new_data)
 
-        # Setup plot widget
+        # Setup plot widget, i.e., envelope of min/max, and mean
+        self.curve_min = self.plt_echo.plot(pen=pg.mkPen((100, 100, 100)))
+        self.curve_max = self.plt_echo.plot(pen=pg.mkPen((100, 100, 100)))
+        self.plt_echo.addItem(pg.FillBetweenItem(self.curve_min, self.curve_max, brush=pg.mkBrush(100, 100, 100, 100)))
         self.curve = self.plt_echo.plot()
         self.plt_echo.getAxis('left').setLabel('Distance (m)')
         self.plt_echo.getAxis('bottom').setLabel('Sample (#)')
+        self.plt_echo.enableAutoRange(x=False, y=True)
+        self.plt_echo.setAutoVisible(y=True)
+        self.plt_echo.getViewBox().sigXRangeChanged.connect(self.x_range_changed)
+        self.plt_echo.getViewBox().sigRangeChangedManually.connect(lambda _: self.cbox_follow.setChecked(False))
 
         # Set initial values of the UI
+        self.cbox_follow.setChecked(True)
         self.sb_window_length.setValue(1000)
 
     def closeEvent(self, event):
-        # Stop timer & Disconnect new data signal
-        self.update_measured_data_timer.stop()
-        self.background_process.new_data_signal.disconnect(self.new_data)
+        # Unregister from render clock & Disconnect new data signal
+        self.render_scheduler.unregister(self)
+        self.background_process.mailbox.new_data_signal.disconnect(self.new_data)
 
         event.accept()
 
-    def new_data(self, value):
+    def new_data(self, _):
         """Slot for incoming data."""
-        # Update buffer
-        self.distance = value['distance']
-        if len(self.distance) <= self.window_length:
-            self.distance_mem = np.roll(self.distance_mem, -len(self.distance))
-            self.distance_mem[-len(self.distance):] = self.distance
+        self.render_scheduler.mark_dirty(self)
+
+    def x_range_changed(self, *_):
+        # Fetch level of detail for the new range after pan or zoom
+        if not self._setting_range:
+            self.render_scheduler.mark_dirty(self)
 
     def sb_window_length_changed(self, value):
-        # Init memory buffer
-        if self.window_length is None:
-            self.distance_mem = np.full(value, np.nan)
-            self.window_length = value
-
-        # Change size of memory buffer
-        if value > self.window_length:
-            self.distance_mem = np.append(np.full(value - self.window_length, np.nan), self.distance_mem)
-        elif value < self.window_length:
-            self.distance_mem = self.distance_mem[-value:]
         self.window_length = value
+        self.render_scheduler.mark_dirty(self)
 
     def update_measured_data(self):
         """Slot to timer for updating user interface with measured data."""
-        if self.distance is not None:
-            self.curve.setData(self.distance_mem)
+        count = self.distance_history.count
+        if count == 0:
+            return
+
+        # Range of view
+        if self.cbox_follow.isChecked():
+            x0, x1 = count - self.window_length, count
+            self._setting_range = True
+            self.plt_echo.setXRange(x0, x1, padding=0)
+            self._setting_range = False
+        else:
+            x0, x1 = self.plt_echo.getViewBox().viewRange()[0]
+
+        # Fetch data at resolution of the plot width
+        max_points = max(self.plt_echo.width(), 100)
+        x, y_min, y_max, y_mean = self.distance_history.view(x0, x1, max_points)
+        self.curve_min.setData(x, y_min)
+        self.curve_max.setData(x, y_max)
+        self.curve.setData(x, y_mean)
@@ -1,18 +1,27 @@
 from PyQt5 import QtWidgets, QtGui, QtCore, uic
 import numpy as np
 from contextlib import suppress
-from scipy.interpolate import interp1d
+from threading import Thread
 from pkg_resources import resource_filename
 
 from .misc import gauge_formatter, MeasurementDataContainer
+from .measurement_table import MeasurementTableModel
 from .alignment import AlignmentWindow
 from .echo import EchoPlotWindow
 from .history import HistoryPlotWindow
+from .waterfall import WaterfallPlotWindow
 from .calibration import SignalCalibrationWindow
+from .render import RenderScheduler
+from .nfc import load_nfc_lookup_tables
 
 
 class MainWindow(QtWidgets.QMainWindow):
-    def __init__(self, app, background_process, *args, **kwargs):
+    # Signals from raw data saving thread
+    raw_data_save_progress_signal = QtCore.pyqtSignal(int, int)
+    raw_data_saved_signal = QtCore.pyqtSignal(object)
+
+    def __init__(self, app, background_process, *args, render_fps=10, raw_data_codec='zlib', raw_data_level=6,
+                 **kwargs):
         super().__init__(*args, **kwargs)
 
         # Initialize appearance of the UI
@@ -55,6 +64,7 @@ class MainWindow(QtWidgets.QMainWindow):
         self.win_alignment = None
         self.win_echo = None
         self.win_history = None
+        self.win_waterfall = None
         self.win_calibration = None
         self.pulse_position_variation_func = None
         self.pulse_phase_variation_func = None
@@ -64,11 +74,19 @@ class MainWindow(QtWidgets.QMainWindow):
         self.measurement_sample_idx = 0
         self.measurement_sample_count = 10
         self.measurement_data_container = MeasurementDataContainer()
+        self.measurement_table_model = MeasurementTableModel(self.measurement_data_container, self)
+        self.table_measurements.setModel(self.measurement_table_model)
+        self.table_measurements.verticalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Fixed)
+
+        # Shared render clock of all windows
+        self.render_scheduler = RenderScheduler(target_fps=render_fps)
+        self.render_scheduler.register(self, self.update_measured_data)
 
-        # Update measured data timer
-        self.update_measured_data_timer = QtCore.QTimer()
-        self.update_measured_data_timer.timeout.connect(self.update_measured_data)
-        self.update_measured_data_timer.start(100)
+        # Raw data saving in background
+        self.raw_data_codec = raw_data_codec
+        self.raw_data_level = raw_data_level
+        self.raw_data_save_progress_signal.connect(self.raw_data_save_progress)
+        self.raw_data_saved_signal.connect(self.raw_data_saved)
 
         # Signals
         self.btn_set_origin.clicked.connect(self.btn_set_origin_clicked)
@@ -88,6 +106,7 @@ class MainWindow(QtWidgets.QMainWindow):
         self.cbox_nfc_pm.clicked.connect(lambda _: self.cbox_nfc_clicked('cbox_nfc_pm'))
         self.ledit_a_tot.textChanged.connect(self.ledit_k_changed)
         self.ledit_r_off.textChanged.connect(self.ledit_k_changed)
+        self.sb_max_targets.valueChanged.connect(self.sb_max_targets_changed)
         self.cbox_nfc_func.clicked.connect(lambda _: self.cbox_nfc_clicked('cbox_nfc_func'))
         self.cobox_direction.currentTextChanged.connect(self.cobox_direction_changed)
 
@@ -97,12 +116,23 @@ class MainWindow(QtWidgets.QMainWindow):
             lambda: self.open_sub_window('win_echo', EchoPlotWindow))
         self.action_history.triggered.connect(
             lambda: self.open_sub_window('win_history', HistoryPlotWindow))
+        self.action_waterfall.triggered.connect(
+            lambda: self.open_sub_window('win_waterfall', WaterfallPlotWindow))
         self.action_calibration.triggered.connect(
             lambda: self.open_sub_window('win_calibration', SignalCalibrationWindow))
+        self.action_reevaluate.triggered.connect(self.action_reevaluate_triggered)
 
-        # Slots to background process
-        self.background_process.new_data_signal.connect(self.new_data)
+        # Status bar
+        self.label_delivery = QtWidgets.QLabel()
+        self.statusBar().addPermanentWidget(self.label_delivery)
+        self.label_render = QtWidgets.QLabel()
+        self.statusBar().addPermanentWidget(self.label_render)
+
+        # Slots to background process (lossless for recording, coalesced for display)
+        self.background_process.recorder.new_data_signal.connect(self.record_data)
+        self.background_process.mailbox.new_data_signal.connect(self.new_data)
         self.background_process.radar_initialized_signal.connect(self.radar_initialized)
+        self.background_process.reevaluation_finished_signal.connect(self.reevaluation_finished)
 
         # Start backgrund process
         background_process.start()
@@ -130,6 +160,7 @@ class MainWindow(QtWidgets.QMainWindow):
         self.ledit_a_tot.setText('%.2f' % 0)
         self.ledit_r_off.setText('%.2f' % 0)
         self.cobox_direction.setCurrentIndex(0)
+        self.sb_max_targets.setValue(0)
         self.cbox_nfc_clicked('cbox_nfc_none')  # Direct call of method as "clicked" signal is used
 
         # Status bar
@@ -143,32 +174,29 @@ class MainWindow(QtWidgets.QMainWindow):
         )
 
     def new_data(self, value):
-        """Slot for incoming data."""
-        if_data = value['if_data']
-        self.distance = value['distance']
-        self.snr = np.mean(value['snr_db'])
-        self.signal_stength = np.mean(value['power_db'])
-        self.refractivity = (np.mean(value['refractive_index']) - 1) * 1E6
-        self.temp = value['temp']
-        self.press = value['press']
-        self.hum = value['hum']
-        self.co2 = value['co2']
-
+        """Slot for incoming data to be displayed (latest frame only)."""
+        self.distance = value.distance
+        self.snr = value.snr
+        self.signal_stength = value.signal_strength
+        self.refractivity = value.refractivity
+        self.temp = value.temp
+        self.press = value.press
+        self.hum = value.hum
+        self.co2 = value.co2
+        self.render_scheduler.mark_dirty(self)
+
+    def record_data(self, value):
+        """Slot for incoming data to be recorded (every frame)."""
         # Add measured data to data container
         if self.measurement_started:
             if self.measurement_sample_idx < self.measurement_sample_count:
-                self.measurement_data_container.add_measurements(
-                    if_data=if_data,
-                    distance=self.distance,
-                    snr=self.snr,
-                    signal_strength=self.signal_stength,
-                    refractivity=self.refractivity,
-                    temp=self.temp,
-                    press=self.press,
-                    hum=self.hum,
-                    co2=self.co2
-                )
-                self.measurement_sample_idx += self.distance.size
+                self.measurement_data_container.add_frame_record(value)
+                self.measurement_sample_idx += value.distance.size
+                self.render_scheduler.mark_dirty(self)
+
+            # Finish measurement series
+            if self.measurement_sample_idx >= self.measurement_sample_count:
+                self.finish_measurement_series()
 
     def cbox_nfc_clicked(self, name):
         # List of checkboxes
@@ -207,6 +235,9 @@ class MainWindow(QtWidgets.QMainWindow):
             roi = [min_, max_]
             self.background_process.set_roi(roi)
 
+    def sb_max_targets_changed(self, value):
+        self.background_process.set_multi_target(value)
+
     def ledit_d_changed(self, _):
         with suppress(ValueError):
             d1 = float(self.ledit_d1.text()) * 1E-3
@@ -224,6 +255,8 @@ class MainWindow(QtWidgets.QMainWindow):
 
     def btn_start_measurement_clicked(self):
         self.measurement_started = True
+        self.background_process.recorder.set_enabled(True)
+        self.render_scheduler.mark_dirty(self)
 
     def btn_load_preset_clicked(self):
         filename, _ = QtWidgets.QFileDialog.getOpenFileName(self, 'Load File', filter='Numpy files (*.npz)')
@@ -249,21 +282,78 @@ class MainWindow(QtWidgets.QMainWindow):
         filename, _ = QtWidgets.QFileDialog.getSaveFileName(self, 'Save File', filter='Numpy files (*.npz)')
         if filename != '':
             radar_config = self.background_process.get_radar_config()
-            self.measurement_data_container.save_raw_data(filename, additional_data={'radar_config': radar_config})
+            container = self.measurement_data_container.snapshot()
+            self.btn_save_raw_data.setEnabled(False)
+            self.statusBar().showMessage('Saving raw data...')
+            Thread(target=self._save_raw_data, args=(filename, container, radar_config), daemon=True).start()
+
+    def _save_raw_data(self, filename, container, radar_config):
+        """Save raw data of container snapshot (runs in separate thread)."""
+        try:
+            container.save_raw_data(filename, additional_data={'radar_config': radar_config},
+                                    codec=self.raw_data_codec, level=self.raw_data_level,
+                                    progress=self.raw_data_save_progress_signal.emit)
+        except Exception as error:
+            self.raw_data_saved_signal.emit(error)
+        else:
+            self.raw_data_saved_signal.emit(None)
+
+    def raw_data_save_progress(self, done, total):
+        self.statusBar().showMessage('Saving raw data... %d %%' % (100 * done / total))
+
+    def raw_data_saved(self, error):
+        self.btn_save_raw_data.setEnabled(True)
+        if error is None:
             self.statusBar().showMessage('Raw data saved sucessfully!', 2000)
+        else:
+            self.statusBar().showMessage('Saving raw data failed: %s' % error, 5000)
 
     def btn_reset_clicked(self):
-        self.measurement_data_container.clear_data()
-        self.table_measurements.setRowCount(0)
+        self.measurement_table_model.clear()
         self.statusBar().showMessage('Measurements cleared!', 2000)
+        self.render_scheduler.mark_dirty(self)
+
+    def action_reevaluate_triggered(self):
+        if self.background_process.reevaluate_buffer():
+            self.statusBar().showMessage('Re-evaluating buffer...')
+        else:
+            self.statusBar().showMessage('Re-evaluation of buffer already running or radar not initialized!', 2000)
+
+    def reevaluation_finished(self, value):
+        """Slot for result of re-evaluation of buffered IF data, shown side by side."""
+        self.statusBar().clearMessage()
+        if 'error' in value:
+            QtWidgets.QMessageBox.warning(self, 'Re-evaluation of Buffer', 'Re-evaluation failed: %s' % value['error'])
+            return
+
+        rows = []
+        for name, func, scale, fmt in [
+            ('Mean (m)', np.nanmean, 1, '%.9f'),
+            ('Std (%sm)' % chr(181), np.nanstd, 1E6, '%.3f'),
+            ('Median (m)', np.nanmedian, 1, '%.9f'),
+        ]:
+            old = func(value['old_distance']) * scale
+            new = func(value['new_distance']) * scale
+            rows.append('<tr><td>%s</td><td>%s</td><td>%s</td><td>%s</td></tr>' % (
+                name, fmt % old, fmt % new, fmt % (new - old)))
+
+        QtWidgets.QMessageBox.information(
+            self, 'Re-evaluation of Buffer',
+            '<p>%d frames re-evaluated with current settings.</p>' % len(value['new_distance']) +
+            '<table cellpadding="4"><tr><th></th><th>Live</th><th>Re-evaluated</th><th>Difference</th></tr>' +
+            ''.join(rows) + '</table>'
+        )
 
     def load_nfc_func(self):
         """Load PPV function from file."""
         filename, _ = QtWidgets.QFileDialog.getOpenFileName(self, 'Load File', filter='Numpy files (*.npz)')
         if filename != '':
-            data = np.load(filename)
-            self.pulse_position_variation_func = interp1d(data['r'], data['pulse_position_variation'])
-            self.pulse_phase_variation_func = interp1d(data['r'], data['pulse_phase_variation'])
+            try:
+                self.pulse_position_variation_func, self.pulse_phase_variation_func = load_nfc_lookup_tables(filename)
+            except (OSError, KeyError, ValueError) as error:
+                self.statusBar().showMessage('Loading PPV function failed: %s' % error, 5000)
+                self.cbox_nfc_clicked('cbox_nfc_none')
+                return
             self.background_process.set_nfc_func(
                 self.pulse_position_variation_func,
                 self.pulse_phase_variation_func
@@ -275,7 +365,7 @@ class MainWindow(QtWidgets.QMainWindow):
         """Open a new sub window."""
         if (getattr(self, win_object_name) is None) or (not getattr(self, win_object_name).isVisible()):
             # Open sub-window if window is not yet open
-            setattr(self, win_object_name, win_class(self.background_process))
+            setattr(self, win_object_name, win_class(self.background_process, self.render_scheduler))
             getattr(self, win_object_name).show()
         elif getattr(self, win_object_name).isVisible():
             # Set window to focus
@@ -304,32 +394,30 @@ class MainWindow(QtWidgets.QMainWindow):
         if self.refractivity is not None:
             self.ledit_refractivity.setText('%.2f' % self.refractivity)
 
+        # Update delivery counters of display data
+        mailbox = self.background_process.mailbox
+        recorder = self.background_process.recorder
+        self.label_delivery.setText(
+            'Dropped frames: %d, lag: %.0f ms (max. %.0f ms), recording stalls: %d (%.1f s)' % (
+                mailbox.dropped, mailbox.lag * 1E3, mailbox.max_lag * 1E3, recorder.stalls, recorder.stall_seconds)
+        )
+
         # Measurement of data
         if self.measurement_started:
             # Update progress bar
             progress = round((self.measurement_sample_idx + 1) / self.measurement_sample_count * 100)
             progress = 100 if progress > 100 else progress
             self.pbar_measurement.setValue(progress)
-            # Update table widget
-            if self.measurement_sample_idx >= self.measurement_sample_count:
-                # Compute values for table item
-                series_number = self.measurement_data_container.n_series + 1
-                distance_mean = self.measurement_data_container.get_series_mean(-1)['distance']
-                distance_std = self.measurement_data_container.get_series_std(-1)['distance']
-                # Set table item
-                row_position = self.table_measurements.rowCount()
-                self.table_measurements.insertRow(row_position)
-                self.table_measurements.setItem(
-                    row_position, 0, QtWidgets.QTableWidgetItem('#%d' % series_number)
-                )
-                self.table_measurements.setItem(
-                    row_position, 1, QtWidgets.QTableWidgetItem('%.9f' % distance_mean)
-                )
-                self.table_measurements.setItem(
-                    row_position, 2, QtWidgets.QTableWidgetItem(chr(177) + '%.3f' % (distance_std * 1E6))
-                )
-                self.table_measurements.scrollToBottom()
-                # Next measurement series
-                self.measurement_started = False
-                self.measurement_sample_idx = 0
-                self.measurement_data_container.next_series()
+
+        # Render clock
+        self.label_render.setText('Render: %.1f fps' % self.render_scheduler.effective_fps)
+
+    def finish_measurement_series(self):
+        """Add finished measurement series to the table, and prepare next series."""
+        self.measurement_table_model.append_series()
+        self.table_measurements.scrollToBottom()
+        # Next measurement series
+        self.measurement_started = False
+        self.background_process.recorder.set_enabled(False)
+        self.measurement_sample_idx = 0
+        self.pbar_measurement.setValue(100)
@@ -0,0 +1,62 @@
+from PyQt5 import QtCore
+import numpy as np
+from datetime import datetime
+
+
+class MeasurementTableModel(QtCore.QAbstractTableModel):
+    """Table model of the finished measurement series, formatting the cells on demand (visible rows only)."""
+    # Header, summary key, and formatter of each column
+    columns = [
+        ('#', 'series', lambda value: '#%d' % value),
+        ('Mean Value (m)', 'distance_mean', lambda value: '%.9f' % value),
+        ('Std (µm)', 'distance_std', lambda value: chr(177) + '%.3f' % (value * 1E6)),
+        ('Median (m)', 'distance_median', lambda value: '%.9f' % value),
+        ('MAD (µm)', 'distance_mad', lambda value: '%.3f' % (value * 1E6)),
+        ('SNR (dB)', 'snr', lambda value: '%.2f' % value),
+        ('Signal Strength (dB)', 'signal_strength', lambda value: '%.2f' % value),
+        ('Refractivity (ppm)', 'refractivity', lambda value: '%.2f' % value),
+        ('Start', 'start_time', lambda value: datetime.fromtimestamp(value).strftime('%H:%M:%S')),
+        ('Stop', 'stop_time', lambda value: datetime.fromtimestamp(value).strftime('%H:%M:%S'))
+    ]
+
+    def __init__(self, measurement_data_container, *args, **kwargs):
+        """Initialize model on the series summaries of the container."""
+        super().__init__(*args, **kwargs)
+        self.container = measurement_data_container
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.container.series_summaries)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        _, key, formatter = self.columns[index.column()]
+        if role == QtCore.Qt.DisplayRole:
+            value = self.container.series_summaries[index.row()][key]
+            if value is None or (np.isscalar(value) and np.isnan(value)):
+                return '-'
+            return formatter(value)
+        elif role == QtCore.Qt.TextAlignmentRole and index.column() > 0:
+            return int(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
+        return None
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if role == QtCore.Qt.DisplayRole and orientation == QtCore.Qt.Horizontal:
+            return self.columns[section][0]
+        return None
+
+    def append_series(self):
+        """Finish the current series of the container, and insert its summary as new row."""
+        row = len(self.container.series_summaries)
+        self.beginInsertRows(QtCore.QModelIndex(), row, row)
+        self.container.next_series()
+        self.endInsertRows()
+
+    def clear(self):
+        """Clear all data of the container."""
+        self.beginResetModel()
+        self.container.clear_data()
+        self.endResetModel()
@@ -0,0 +1,147 @@
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+from time import perf_counter, time
+
+
+class LoopMetrics:
+    """Cumulative counters and gauges of the processing loop.
+
+    Updated by the worker thread by plain attribute assignments (no locks), and read by the metrics server.
+    """
+    def __init__(self, window=10., max_frame_rate=1000):
+        """Initialize metrics, with time window (s) of the frame rate, which is counted up to max_frame_rate."""
+        self.window = window
+        self.frames = 0
+        self.usb_timeouts = 0
+        self.sensor_read_failures = {'atm': 0, 'co2': 0}
+        self.loop_seconds_sum = 0.  # Loop time, including acquisition
+        self.processing_seconds_sum = 0.  # Loop time, excluding acquisition
+        self.last_frame_time = None
+        self._start = perf_counter()
+        self._frame_stops = deque(maxlen=int(window * max_frame_rate))  # perf_counter values of frames in window
+
+    def record_frame(self, loop_start, processing_start, stop):
+        """Record processed frame, given perf_counter values at start of loop, start of processing, and stop."""
+        self.frames += 1
+        self.loop_seconds_sum += stop - loop_start
+        self.processing_seconds_sum += stop - processing_start
+        self._frame_stops.append(stop)
+        self.last_frame_time = time()
+
+    @property
+    def frame_rate(self):
+        """Frame rate (1/s), i.e., frames processed within the window until now by wall-clock time.
+
+        The rate drops while no frames are processed (e.g., on USB timeouts), since it is evaluated when read.
+        """
+        now = perf_counter()
+        window = min(self.window, now - self._start)
+        if window <= 0:
+            return 0.
+        frame_stops = list(self._frame_stops)  # Copy, since appended by the worker thread
+        return sum(stop > now - window for stop in frame_stops) / window
+
+
+def format_metrics(background_process, prefix='rangingtool'):
+    """Get metrics of background process in Prometheus text exposition format."""
+    metrics = background_process.metrics
+    mailbox = background_process.mailbox
+    lines = []
+
+    def add(name, metric_type, help_text, samples):
+        lines.append('# HELP %s_%s %s' % (prefix, name, help_text))
+        lines.append('# TYPE %s_%s %s' % (prefix, name, metric_type))
+        for suffix, labels, value in samples:
+            labels = '{%s}' % ','.join('%s="%s"' % label for label in labels.items()) if labels else ''
+            lines.append('%s_%s%s%s %r' % (prefix, name, suffix, labels, float(value)))
+
+    add('frames_total', 'counter', 'Frames processed.', [('', None, metrics.frames)])
+    add('usb_timeouts_total', 'counter', 'USB TMC timeouts of the radar.', [('', None, metrics.usb_timeouts)])
+    add('sensor_read_failures_total', 'counter', 'Failed reads of atmospheric sensors.', [
+        ('', {'sensor': sensor}, count) for sensor, count in metrics.sensor_read_failures.items()
+    ])
+    add('loop_seconds', 'summary', 'Loop time per frame, including acquisition.', [
+        ('_sum', None, metrics.loop_seconds_sum), ('_count', None, metrics.frames)
+    ])
+    add('processing_seconds', 'summary', 'Loop time per frame, excluding acquisition.', [
+        ('_sum', None, metrics.processing_seconds_sum), ('_count', None, metrics.frames)
+    ])
+    add('frame_rate', 'gauge', 'Frame rate (1/s) within the last %g s.' % metrics.window, [
+        ('', None, metrics.frame_rate)
+    ])
+    # Staleness signal, e.g., alert if time() - timestamp exceeds a few frame intervals
+    if metrics.last_frame_time is not None:
+        add('last_frame_timestamp_seconds', 'gauge', 'Unix time of the last processed frame (staleness signal).', [
+            ('', None, metrics.last_frame_time)
+        ])
+    # Delivery to the GUI thread per consumer slot, i.e., display (mailbox) and recording (bounded queue, lossless)
+    recorder = background_process.recorder
+    slots = {
+        'display': (mailbox, mailbox.dropped),
+        'recording': (recorder, 0)
+    }
+    add('posted_frames_total', 'counter', 'Frames posted to the consumer slot.', [
+        ('', {'slot': name}, slot.posted) for name, (slot, _) in slots.items()
+    ])
+    add('delivered_frames_total', 'counter', 'Frames delivered from the consumer slot.', [
+        ('', {'slot': name}, slot.delivered) for name, (slot, _) in slots.items()
+    ])
+    add('dropped_frames_total', 'counter',
+        'Frames dropped by the consumer slot (display: superseded by newer frames, recording: never).', [
+            ('', {'slot': name}, dropped) for name, (_, dropped) in slots.items()
+        ])
+    add('queue_depth_frames', 'gauge', 'Frames waiting for delivery in the consumer slot.', [
+        ('', {'slot': name}, slot.depth) for name, (slot, _) in slots.items()
+    ])
+    add('delivery_lag_seconds', 'gauge', 'Delivery lag of the last frame of the consumer slot.', [
+        ('', {'slot': name}, slot.lag) for name, (slot, _) in slots.items()
+    ])
+    add('delivery_lag_max_seconds', 'gauge', 'Maximum delivery lag of the consumer slot.', [
+        ('', {'slot': name}, slot.max_lag) for name, (slot, _) in slots.items()
+    ])
+    add('recording_stalls_total', 'counter', 'Frames blocking the worker due to a full recording queue.', [
+        ('', None, recorder.stalls)
+    ])
+    add('recording_stall_seconds_total', 'counter', 'Time the worker was blocked by a full recording queue.', [
+        ('', None, recorder.stall_seconds)
+    ])
+    add('if_buffer_frames', 'gauge', 'Frames retained for re-evaluation.', [
+        ('', None, background_process.if_buffer.count)
+    ])
+    if background_process.shared_frames is not None:
+        add('shared_frames_seq', 'gauge', 'Sequence number of the last frame in shared memory.', [
+            ('', None, background_process.shared_frames.seq)
+        ])
+    return '\n'.join(lines) + '\n'
+
+
+class MetricsServer:
+    """Local HTTP server of the metrics of a background process (GET /metrics), running in a daemon thread."""
+    def __init__(self, background_process, port, host='127.0.0.1'):
+        """Initialize server."""
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = format_metrics(background_process).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *_):
+                pass  # No logging of requests
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.thread = Thread(target=self.server.serve_forever, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -1,4 +1,22 @@
 import numpy as np
+import os
+import zlib
+import bz2
+import lzma
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from copy import copy, deepcopy
+from time import time
+from .quantiles import QuantileSketch
+from .averaging import RunningStatistics
+from .detection import TargetAssociation
+
+# Codecs of raw data (compress with level, decompress)
+RAW_DATA_CODECS = {
+    'zlib': (lambda data, level: zlib.compress(data, level), zlib.decompress),
+    'bz2': (lambda data, level: bz2.compress(data, level), bz2.decompress),
+    'lzma': (lambda data, level: lzma.compress(data, preset=level), lzma.decompress)
+}
 
 
 def gauge_formatter(value, precision):
@@ -30,13 +48,40 @@ def gauge_formatter(value, precision):
     return ''.join(loc)
 
 
+class GrowableArray:
+    """Typed 1D array with amortized O(1) appends, whose capacity is doubled when full.
+
+    Appended values are never modified, i.e., a shallow copy is a consistent snapshot of the values appended so far.
+    """
+    def __init__(self, dtype=float, capacity=1024):
+        """Initialize empty array."""
+        self._data = np.empty(capacity, dtype=dtype)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, value):
+        if self._size == len(self._data):
+            data = np.empty(2 * len(self._data), dtype=self._data.dtype)
+            data[:self._size] = self._data
+            self._data = data
+        self._data[self._size] = value
+        self._size += 1
+
+    @property
+    def values(self):
+        """View on the appended values."""
+        return self._data[:self._size]
+
+
 class MeasurementDataContainer:
     """Container for measurement data."""
-    def __init__(self):
-        """Initialize container."""
+    def __init__(self, percentiles=(5, 95)):
+        """Initialize container, with percentiles (%) of the robust distance statistics."""
+        self.percentiles = percentiles
         self.entries = [
-            'if_data',
-            'distance',
+            'if_data',  # List of frames per series
             'snr',
             'signal_strength',
             'refractivity',
@@ -45,6 +90,12 @@ class MeasurementDataContainer:
             'hum',
             'co2'
         ]
+        self.scalar_entries = self.entries[1:]  # Typed arrays per series (see GrowableArray), NaN if not available
+        self.target_entries = [  # Per-target statistics of the associated detections (see TargetAssociation)
+            'target_distance',
+            'target_snr',
+            'target_power'
+        ]
 
         self.n_series = None
         self.clear_data()
@@ -52,64 +103,299 @@ class MeasurementDataContainer:
     def add_measurements(self, **kwargs):
         """Add measurements to the current series of the container."""
         for key in kwargs:
-            if key in self.entries:
+            if key in self.scalar_entries:
                 value = kwargs[key]
-                getattr(self, key)[self.n_series].append(value)
+                getattr(self, key)[self.n_series].append(np.nan if value is None else value)
+            elif key in self.entries:
+                getattr(self, key)[self.n_series].append(kwargs[key])
+        if 'distance' in kwargs:  # Only statistics are retained
+            self.distance_statistics[self.n_series].update(kwargs['distance'])
+            self.distance_sketches[self.n_series].update(kwargs['distance'])
+
+        # Timestamps of first and last measurement
+        series_times = self.series_times[self.n_series]
+        series_times[1] = time()
+        if series_times[0] is None:
+            series_times[0] = series_times[1]
+
+    def add_frame_record(self, record):
+        """Add measurements of a frame record (see FrameRecord) to the current series of the container."""
+        self.add_measurements(
+            if_data=record.if_data,
+            distance=record.distance,
+            snr=record.snr,
+            signal_strength=record.signal_strength,
+            refractivity=record.refractivity,
+            temp=record.temp,
+            press=record.press,
+            hum=record.hum,
+            co2=record.co2
+        )
+        if record.target_distance is not None:
+            self.targets[self.n_series].update(record.target_distance, record.target_snr_db, record.target_power_db)
+
+    def get_series_summary(self, n):
+        """Get summary of series n, i.e., statistics of distance, means of signal and atmospheric data, and times."""
+        mean = self.get_series_mean(n)
+        summary = {
+            'series': n + 1,
+            'distance_mean': mean['distance'],
+            'distance_std': self.get_series_std(n)['distance'],
+            'snr': mean['snr'],
+            'signal_strength': mean['signal_strength'],
+            'refractivity': mean['refractivity'],
+            'start_time': self.series_times[n][0],
+            'stop_time': self.series_times[n][1]
+        }
+        summary.update(self.get_series_quantiles(n))
+        return summary
 
     def next_series(self):
-        """Increment measurement series."""
+        """Increment measurement series, whereby the summary of the finished series is retained."""
+        self.series_summaries.append(self.get_series_summary(self.n_series))
         self.n_series += 1
-        for entry in self.entries:
-            getattr(self, entry).append([])
+        self.series_times.append([None, None])
+        self.if_data.append([])
+        for entry in self.scalar_entries:
+            getattr(self, entry).append(GrowableArray())
+        self.distance_statistics.append(RunningStatistics())
+        self.distance_sketches.append(QuantileSketch())
+        self.targets.append(TargetAssociation())
 
     def clear_data(self):
         """Clear measurement data."""
         self.n_series = 0
-        for entry in self.entries:
-            setattr(self, entry, [[]])
+        self.if_data = [[]]
+        for entry in self.scalar_entries:
+            setattr(self, entry, [GrowableArray()])
+        # Statistics of distance in constant memory, i.e., the distances of the sweeps are not retained
+        self.distance_statistics = [RunningStatistics()]
+        self.distance_sketches = [QuantileSketch()]  # Robust statistics
+        self.targets = [TargetAssociation()]  # Detections associated to targets over the series
+        self.series_times = [[None, None]]
+        self.series_summaries = []
+
+    def _get_series_with_data(self):
+        """Get indices of series with measurements."""
+        return [n for n, series_times in enumerate(self.series_times) if series_times[0] is not None]
+
+    def _get_distance_statistic(self, key, n=None):
+        """Get statistic key ('mean' or 'std') of distance of series n, or of all series."""
+        if n is not None:
+            return getattr(self.distance_statistics[n], key)
+        return np.asarray([getattr(self.distance_statistics[n], key) for n in self._get_series_with_data()])
+
+    def _get_scalar_statistic(self, func, entry, n=None):
+        """Get statistic func of scalar entry of series n, or of all series, whereby None if data is not available."""
+        def statistic(series):
+            values = series.values
+            if len(values) == 0:
+                return np.nan
+            if np.all(np.isnan(values)):
+                return None
+            return func(values)
+
+        if n is not None:
+            return statistic(getattr(self, entry)[n])
+
+        data = [statistic(getattr(self, entry)[n]) for n in self._get_series_with_data()]
+        if len(data) > 0 and all(_data is None for _data in data):
+            return None
+        return np.asarray([np.nan if _data is None else _data for _data in data])
 
     def get_series_mean(self, n=None):
         """Get mean measurement data of series n."""
-        data = {}
-        for entry in self.entries:
-            if entry != 'if_data':
-                try:
-                    if n is not None:
-                        data[entry] = np.mean(getattr(self, entry)[n])
-                    else:
-                        data[entry] = np.asarray([np.mean(_data) for _data in getattr(self, entry) if len(_data) > 0])
-                except TypeError:  # If data is not available
-                    data[entry] = None
+        data = {'distance': self._get_distance_statistic('mean', n)}
+        data.update({entry: self._get_scalar_statistic(np.nanmean, entry, n) for entry in self.scalar_entries})
+        data.update({entry: self._get_target_statistic(entry[len('target_'):], n) for entry in self.target_entries})
+        data['target_rate'] = self._get_target_statistic('rate', n)
         return data
 
     def get_series_std(self, n=None):
         """Get standard deviation of measurement data of series n."""
-        data = {}
-        for entry in self.entries:
-            if entry != 'if_data':
-                try:
-                    if n is not None:
-                        data[entry] = np.std(getattr(self, entry)[n])
-                    else:
-                        data[entry] = np.asarray([np.std(_data) for _data in getattr(self, entry) if len(_data) > 0])
-                except TypeError:  # If data is not available
-                    data[entry] = None
+        data = {'distance': self._get_distance_statistic('std', n)}
+        data.update({entry: self._get_scalar_statistic(np.nanstd, entry, n) for entry in self.scalar_entries})
+        data.update({
+            entry: self._get_target_statistic(entry[len('target_'):] + '_std', n) for entry in self.target_entries
+        })
+        return data
+
+    def get_series_quantiles(self, n=None):
+        """Get robust statistics of distance of series n, i.e., median, MAD and percentiles."""
+        def statistics(sketch):
+            data = {'distance_median': sketch.median(), 'distance_mad': sketch.mad()}
+            data.update({
+                'distance_p%g' % percentile: sketch.quantile(percentile / 100) for percentile in self.percentiles
+            })
+            return data
+
+        if n is not None:
+            return statistics(self.distance_sketches[n])
+
+        data = [statistics(self.distance_sketches[n]) for n in self._get_series_with_data()]
+        keys = ['distance_median', 'distance_mad'] + ['distance_p%g' % percentile for percentile in self.percentiles]
+        return {key: np.asarray([_data[key] for _data in data]) for key in keys}
+
+    def _get_target_statistic(self, key, n=None):
+        """Get statistic key of the targets (see TargetAssociation) of series n, or of all series as array of shape
+        [#Series, #Target].
+        """
+        def statistic(targets):
+            return targets.targets()[key] if targets.sweeps > 0 else None
+
+        if n is not None:
+            return statistic(self.targets[n])
+
+        # Align rows with series of measurements, and pad to maximum number of targets
+        statistics = [statistic(self.targets[n]) for n in self._get_series_with_data()]
+        n_targets = max([len(_data) for _data in statistics if _data is not None], default=0)
+        if n_targets == 0:
+            return None
+        data = np.full((len(statistics), n_targets), np.nan)
+        for idx, _data in enumerate(statistics):
+            if _data is not None:
+                data[idx, :len(_data)] = _data
         return data
 
     def save_data(self, filename):
         """Save processed measurement data to CSV file."""
-        data = self.get_series_mean()
+        data = {}
+        series_data = self.get_series_mean()
+        series_data.update(self.get_series_quantiles())
+        for key, value in series_data.items():
+            if value is None:  # Data not available
+                continue
+            if np.ndim(value) == 2:  # One column per target
+                data.update({key + '_%d' % idx: value[:, idx] for idx in range(value.shape[1])})
+            else:
+                data[key] = value
         delimiter = ','
         header = ''.join([key + ',' for key in data])[:-1]
         data_array = np.asarray([data[key] for key in data]).T
 
         np.savetxt(filename, data_array, header=header, fmt='%.9E', delimiter=delimiter, newline='\n')
 
-    def save_raw_data(self, filename, additional_data=None):
-        """Save raw measurement data including configuration as numpy file."""
-        data = {'if_data': np.asarray([_data for _data in self.if_data if len(_data) > 0])}
+    def snapshot(self):
+        """Get snapshot of the container, which can be evaluated or saved in another thread.
+
+        Only the lists of frames and the sizes of the typed arrays are copied (not the measurements), i.e., it is cheap
+        enough for the GUI thread.
+        """
+        snapshot = copy(self)
+        snapshot.if_data = [list(series) for series in self.if_data]
+        for entry in self.scalar_entries:
+            setattr(snapshot, entry, [copy(series) for series in getattr(self, entry)])
+        snapshot.distance_statistics = deepcopy(self.distance_statistics)  # Statistics are updated in place
+        snapshot.distance_sketches = deepcopy(self.distance_sketches)
+        snapshot.targets = deepcopy(self.targets)
+        snapshot.series_times = [list(series_times) for series_times in self.series_times]
+        snapshot.series_summaries = list(self.series_summaries)
+        return snapshot
+
+    def get_raw_data(self, additional_data=None, stack=True):
+        """Get raw measurement data including configuration.
+
+        The IF data is stacked to an array [#Series, #Frame, #Sweep, #Sample], or is given as list of series of frames
+        if stack is False (see save_raw_data).
+        """
+        if_data = [series for series in self.if_data if len(series) > 0]
+        data = {'if_data': np.asarray(if_data) if stack else if_data}
         data.update(self.get_series_mean())
+        data.update(self.get_series_quantiles())
         if additional_data is not None:
             data.update(additional_data)  # Config etc.
+        return data
+
+    def save_raw_data(self, filename, additional_data=None, **kwargs):
+        """Save raw measurement data including configuration as numpy file (see save_raw_data)."""
+        save_raw_data(filename, self.get_raw_data(additional_data, stack=False), **kwargs)
+
+
+def _iter_chunks(frames, chunk_size):
+    """Iterate over the bytes of frames (C-contiguous arrays) in chunks of chunk_size bytes (except the last)."""
+    pieces = []
+    size = 0
+    for frame in frames:
+        buffer = memoryview(frame.reshape(-1).view(np.uint8))
+        while len(buffer) > 0:
+            piece = buffer[:chunk_size - size]
+            buffer = buffer[len(piece):]
+            pieces.append(piece)
+            size += len(piece)
+            if size == chunk_size:
+                yield pieces[0] if len(pieces) == 1 else b''.join(pieces)
+                pieces = []
+                size = 0
+    if size > 0:
+        yield b''.join(pieces)
+
+
+def save_raw_data(filename, data, codec='zlib', level=6, chunk_size=2**24, workers=None, progress=None):
+    """Save raw data as numpy file, whereby IF data is compressed in chunks in parallel.
+
+    The IF data (array, or list of series of frames of equal count and shape) is split into chunks of chunk_size
+    bytes, which are compressed by codec ('zlib', 'bz2' or 'lzma') with level on a pool of workers. Chunks are
+    assembled only while workers are available, i.e., the IF data is not copied as a whole. The compressed chunks are
+    stored as uint8 array if_data_chunks, together with their sizes, and the codec, dtype and shape of the IF data
+    (see load_raw_data). progress(done, total) is called after each chunk.
+    """
+    compress, _ = RAW_DATA_CODECS[codec]
+    data = dict(data)
+    if_data = data.pop('if_data')
+    if isinstance(if_data, np.ndarray):
+        frames = [np.ascontiguousarray(if_data)]
+        shape, dtype = if_data.shape, if_data.dtype
+    else:
+        frames = [np.ascontiguousarray(frame) for series in if_data for frame in series]
+        if len(frames) == 0:
+            shape, dtype = (0,), np.dtype(float)
+        else:
+            shape, dtype = (len(if_data), len(if_data[0])) + frames[0].shape, frames[0].dtype
+            if len(frames) != shape[0] * shape[1] or any(frame.shape != frames[0].shape for frame in frames):
+                raise ValueError('IF data of all series must be of equal number and shape of frames')
+    n_chunks = -(-sum(frame.nbytes for frame in frames) // chunk_size)
+    workers = workers if workers is not None else os.cpu_count() or 1
+
+    compressed = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        max_pending = 2 * workers  # Bounds memory of assembled chunks
+        pending = deque()
+        for chunk in _iter_chunks(frames, chunk_size):
+            pending.append(executor.submit(compress, chunk, level))
+            while len(pending) >= max_pending or (len(pending) > 0 and pending[0].done()):
+                compressed.append(pending.popleft().result())
+                if progress is not None:
+                    progress(len(compressed), n_chunks)
+        while len(pending) > 0:
+            compressed.append(pending.popleft().result())
+            if progress is not None:
+                progress(len(compressed), n_chunks)
+
+    data.update({
+        'if_data_chunks': np.frombuffer(b''.join(compressed), dtype=np.uint8),
+        'if_data_chunk_sizes': np.asarray([len(chunk) for chunk in compressed], dtype=np.int64),
+        'if_data_codec': codec,
+        'if_data_dtype': dtype.str,
+        'if_data_shape': np.asarray(shape, dtype=np.int64)
+    })
+    np.savez(filename, **data)
+
 
-        np.savez_compressed(filename, **data)
+def load_raw_data(filename, workers=None):
+    """Load raw data saved by save_raw_data (or by np.savez_compressed) as dictionary, including IF data."""
+    with np.load(filename, allow_pickle=True) as file:
+        data = {key: file[key] for key in file.files}
+    if 'if_data_chunks' in data:
+        _, decompress = RAW_DATA_CODECS[str(data.pop('if_data_codec'))]
+        offsets = np.cumsum(np.concatenate(([0], data.pop('if_data_chunk_sizes'))))
+        buffer = data.pop('if_data_chunks')
+        chunks = [buffer[offsets[idx]:offsets[idx + 1]].data for idx in range(len(offsets) - 1)]
+        if_data = np.empty(tuple(data.pop('if_data_shape')), dtype=str(data.pop('if_data_dtype')))
+        output = if_data.reshape(-1).view(np.uint8)
+        position = 0
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for chunk in executor.map(decompress, chunks):
+                output[position:position + len(chunk)] = np.frombuffer(chunk, dtype=np.uint8)
+                position += len(chunk)
+        data['if_data'] = if_data
+    return data
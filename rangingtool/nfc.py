@@ -0,0 +1,111 @@
+import os
+import numpy as np
+from warnings import warn
+from scipy.interpolate import CubicSpline
+
+
+class UniformLookupTable:
+    """Lookup table of a function sampled on a uniform grid, with vectorized linear or cubic evaluation."""
+    def __init__(self, x0, dx, y, kind='linear'):
+        """Initialize lookup table with y sampled at x0 + dx * n."""
+        if kind not in ('linear', 'cubic'):
+            raise ValueError('Unknown kind of interpolation: %s' % kind)
+        self.x0 = float(x0)
+        self.dx = float(dx)
+        self.y = np.asarray(y, dtype=float)
+        self.kind = kind
+        self.x_min = self.x0
+        self.x_max = self.x0 + (len(self.y) - 1) * self.dx
+        self._grid = self.x0 + np.arange(len(self.y)) * self.dx
+
+        # Polynomial coefficients of cubic convolution (Catmull-Rom) per interval, whereby the table is padded by linear
+        # extrapolation at the boundaries
+        y_pad = np.concatenate(([2 * self.y[0] - self.y[1]], self.y, [2 * self.y[-1] - self.y[-2]]))
+        p0, p1, p2, p3 = y_pad[:-3], y_pad[1:-2], y_pad[2:-1], y_pad[3:]
+        self._coef = np.stack((
+            p1,
+            0.5 * (p2 - p0),
+            0.5 * (2 * p0 - 5 * p1 + 4 * p2 - p3),
+            0.5 * (3 * (p1 - p2) + p3 - p0)
+        ), axis=-1)
+
+    @classmethod
+    def from_samples(cls, x, y, n_points=None, kind='linear'):
+        """Compile lookup table from (non-uniform) samples.
+
+        By default, the grid spacing equals the minimum spacing of the samples, limited to 2**16 grid points.
+        """
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        order = np.argsort(x)
+        x, y = x[order], y[order]
+
+        if n_points is None:
+            n_points = int(np.ceil((x[-1] - x[0]) / np.min(np.diff(x)))) + 1
+            n_points = min(max(n_points, len(x)), 2 ** 16)
+        grid = np.linspace(x[0], x[-1], n_points)
+
+        # Resample once on uniform grid
+        if kind == 'cubic':
+            y_grid = CubicSpline(x, y)(grid)
+        else:
+            y_grid = np.interp(grid, x, y)
+
+        return cls(x[0], grid[1] - grid[0], y_grid, kind=kind)
+
+    def __call__(self, x):
+        """Evaluate lookup table at x."""
+        x = np.asarray(x, dtype=float)
+        tolerance = 1E-9 * self.dx  # Rounding of grid
+        if x.min() < self.x_min - tolerance or x.max() > self.x_max + tolerance:
+            raise ValueError('A value in x is out of the range of the lookup table [%g, %g].'
+                             % (self.x_min, self.x_max))
+
+        if self.kind == 'linear':
+            return np.interp(x, self._grid, self.y)
+
+        u = (x - self.x0) / self.dx
+        idx = np.minimum(u.astype(int), len(self.y) - 2)
+        t = u - idx
+        coef = self._coef[idx]
+        return coef[..., 0] + t * (coef[..., 1] + t * (coef[..., 2] + t * coef[..., 3]))
+
+
+def load_nfc_lookup_tables(filename, kind='linear', n_points=None):
+    """Load PPV and pulse phase variation of file as lookup tables.
+
+    The compiled tables are cached next to the file (*.npz.lut, not matched by file dialogs of *.npz), and the cache
+    is rebuilt when the file or the settings of the tables change, or if it cannot be loaded.
+    """
+    cache_filename = filename + '.lut'
+    stat = os.stat(filename)
+    key = np.asarray([stat.st_mtime_ns, stat.st_size], dtype=np.int64)
+
+    # Load cached tables
+    try:
+        with np.load(cache_filename) as data:
+            if (np.array_equal(data['key'], key) and str(data['kind']) == kind
+                    and (n_points is None or len(data['pulse_position_variation']) == n_points)):
+                return tuple(
+                    UniformLookupTable(data['x0'], data['dx'], data[name], kind=kind)
+                    for name in ('pulse_position_variation', 'pulse_phase_variation')
+                )
+    except Exception:  # Missing, outdated or corrupt cache
+        pass
+
+    # Compile tables
+    with np.load(filename) as data:
+        tables = tuple(
+            UniformLookupTable.from_samples(data['r'], data[name], n_points=n_points, kind=kind)
+            for name in ('pulse_position_variation', 'pulse_phase_variation')
+        )
+
+    # Save cache
+    try:
+        with open(cache_filename, 'wb') as file:  # File object, since np.savez would append .npz to the name
+            np.savez(file, key=key, kind=kind, x0=tables[0].x0, dx=tables[0].dx,
+                     pulse_position_variation=tables[0].y, pulse_phase_variation=tables[1].y)
+    except OSError:
+        warn('Could not cache lookup tables to %s' % cache_filename)
+
+    return tables
@@ -0,0 +1,135 @@
+import numpy as np
+from threading import Lock
+
+
+class MinMaxPyramid:
+    """Incrementally maintained min/max/mean pyramid of a stream of samples for level-of-detail views.
+
+    Level k >= 1 aggregates blocks of factor**k samples. Raw samples are retained for the last max_raw_length samples
+    only, whereas the aggregates cover the full stream, i.e., the memory per sample is bounded by about
+    4 / (factor - 1) values.
+    """
+    def __init__(self, factor=8, max_raw_length=2**22):
+        """Initialize pyramid."""
+        self.factor = factor
+        self.max_raw_length = max_raw_length
+        self.count = 0
+        self._raw = np.full(max_raw_length, np.nan)
+        self._levels = []  # Arrays 'min', 'max', 'sum' and 'count' of aggregates, and 'length', per level
+        self._lock = Lock()
+
+    def clear(self):
+        """Clear all samples."""
+        with self._lock:
+            self.count = 0
+            self._raw[:] = np.nan
+            self._levels = []
+
+    @staticmethod
+    def _new_level(capacity):
+        return {
+            'min': np.full(capacity, np.nan),
+            'max': np.full(capacity, np.nan),
+            'sum': np.zeros(capacity),
+            'count': np.zeros(capacity, dtype=np.int64),
+            'length': 0
+        }
+
+    def _write_level(self, k, b0, mins, maxs, sums, counts):
+        """Write aggregates of level k (>= 1) starting at block b0, growing its arrays if necessary."""
+        if len(self._levels) < k:
+            self._levels.append(self._new_level(max(1024, len(mins))))
+        level = self._levels[k - 1]
+        b1 = b0 + len(mins)
+        if b1 > len(level['min']):
+            grown = self._new_level(max(2 * len(level['min']), b1))
+            for key in ('min', 'max', 'sum', 'count'):
+                grown[key][:level['length']] = level[key][:level['length']]
+            level.update(grown)
+        level['min'][b0:b1] = mins
+        level['max'][b0:b1] = maxs
+        level['sum'][b0:b1] = sums
+        level['count'][b0:b1] = counts
+        level['length'] = b1
+
+    def append(self, values):
+        """Append samples, whereby NaN values are ignored by the aggregates."""
+        values = np.ravel(np.asarray(values, dtype=float))
+        if len(values) == 0:
+            return
+
+        f = self.factor
+        with self._lock:
+            start = self.count
+            stop = start + len(values)
+
+            # Raw samples (ring buffer)
+            idx = np.arange(max(start, stop - self.max_raw_length), stop)
+            self._raw[idx % self.max_raw_length] = values[idx - start]
+            self.count = stop
+
+            # Level 1 from raw samples of the affected blocks
+            first = start // f * f
+            samples = self._raw[np.arange(first, stop) % self.max_raw_length]
+            samples = np.pad(samples, (0, -len(samples) % f), constant_values=np.nan).reshape(-1, f)
+            is_valid = ~np.isnan(samples)
+            self._write_level(
+                1, first // f,
+                np.fmin.reduce(samples, axis=1),
+                np.fmax.reduce(samples, axis=1),
+                np.where(is_valid, samples, 0).sum(axis=1),
+                is_valid.sum(axis=1)
+            )
+
+            # Higher levels from the affected blocks of the level below
+            k = 1
+            first //= f
+            while self._levels[k - 1]['length'] > 1:
+                level = self._levels[k - 1]
+                first = first // f * f
+                length = level['length']
+                pad = -(length - first) % f
+                blocks = {
+                    key: np.pad(level[key][first:length], (0, pad),
+                                constant_values=np.nan if key in ('min', 'max') else 0).reshape(-1, f)
+                    for key in ('min', 'max', 'sum', 'count')
+                }
+                self._write_level(
+                    k + 1, first // f,
+                    np.fmin.reduce(blocks['min'], axis=1),
+                    np.fmax.reduce(blocks['max'], axis=1),
+                    blocks['sum'].sum(axis=1),
+                    blocks['count'].sum(axis=1)
+                )
+                k += 1
+                first //= f
+
+    def view(self, x0, x1, max_points):
+        """Get sample positions, min, max and mean of samples in [x0, x1) at a resolution of at most max_points."""
+        with self._lock:
+            x0 = int(np.clip(np.floor(x0), 0, self.count))
+            x1 = int(np.clip(np.ceil(x1), 0, self.count))
+            if x1 <= x0:
+                empty = np.empty(0)
+                return empty, empty, empty, empty
+
+            # Choose finest level with sufficiently few points
+            k = 0
+            if x1 - x0 > max_points or x0 < self.count - self.max_raw_length:
+                k = 1
+                while k < len(self._levels) and (x1 - x0) / self.factor ** k > max_points:
+                    k += 1
+
+            if k == 0:
+                x = np.arange(x0, x1)
+                values = self._raw[x % self.max_raw_length]
+                return x.astype(float), values, values, values
+
+            size = self.factor ** k
+            level = self._levels[k - 1]
+            b0, b1 = x0 // size, min(-(-x1 // size), level['length'])
+            x = np.arange(b0, b1) * size + (size - 1) / 2
+            counts = level['count'][b0:b1]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mean = np.where(counts > 0, level['sum'][b0:b1] / counts, np.nan)
+            return x, level['min'][b0:b1].copy(), level['max'][b0:b1].copy(), mean
@@ -0,0 +1,90 @@
+import numpy as np
+
+
+class QuantileSketch:
+    """Streaming quantile sketch in constant memory.
+
+    Samples are collected in a buffer of fixed size, which is merged into weighted centroids whenever it is full
+    (merging t-digest with scale function k1 = compression / (2 pi) * arcsin(2 q - 1)). Since k1 spans the range
+    [-compression / 4, compression / 4], there are at most compression / 2 + 1 centroids, i.e., memory is bounded by
+    buffer_size + compression / 2 + 1 values. Centroids are small at the tails and large at the median, such that
+    quantiles are accurate in particular at the tails.
+    """
+    def __init__(self, compression=200, buffer_size=1000):
+        """Initialize sketch."""
+        self.compression = compression
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self._means = np.empty(0)
+        self._weights = np.empty(0)
+        self._buffer = np.empty(buffer_size)
+        self._n_buffer = 0
+
+    def update(self, values):
+        """Add values to the sketch, whereby NaN values are ignored."""
+        values = np.ravel(np.asarray(values, dtype=float))
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+
+        self.count += len(values)
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+
+        while len(values) > 0:
+            n = min(len(values), len(self._buffer) - self._n_buffer)
+            self._buffer[self._n_buffer:self._n_buffer + n] = values[:n]
+            self._n_buffer += n
+            values = values[n:]
+            if self._n_buffer == len(self._buffer):
+                self._compress()
+
+    def _compress(self):
+        """Merge buffer into centroids."""
+        means = np.concatenate((self._means, self._buffer[:self._n_buffer]))
+        weights = np.concatenate((self._weights, np.ones(self._n_buffer)))
+        self._n_buffer = 0
+
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+
+        # Group by integer part of scale function at the quantiles of the centroids
+        q = (np.cumsum(weights) - weights / 2) / np.sum(weights)
+        k = np.floor(self.compression / (2 * np.pi) * np.arcsin(2 * q - 1))
+        starts = np.flatnonzero(np.concatenate(([True], k[1:] != k[:-1])))
+        self._weights = np.add.reduceat(weights, starts)
+        self._means = np.add.reduceat(means * weights, starts) / self._weights
+
+    def _centroids(self):
+        """Get centroids, including buffered samples."""
+        if self._n_buffer > 0:
+            self._compress()
+        return self._means, self._weights
+
+    def quantile(self, q):
+        """Get quantile(s) q in [0, 1]."""
+        if self.count == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) > 0 else np.nan
+        means, weights = self._centroids()
+        centers = np.cumsum(weights) - weights / 2
+        return np.interp(
+            np.asarray(q) * self.count,
+            np.concatenate(([0], centers, [self.count])),
+            np.concatenate(([self.min], means, [self.max]))
+        )
+
+    def median(self):
+        """Get median."""
+        return self.quantile(0.5)
+
+    def mad(self):
+        """Get median absolute deviation (MAD), estimated as weighted median of the deviations of the centroids."""
+        if self.count == 0:
+            return np.nan
+        means, weights = self._centroids()
+        deviations = np.abs(means - self.median())
+        order = np.argsort(deviations)
+        deviations, weights = deviations[order], weights[order]
+        centers = np.cumsum(weights) - weights / 2
+        return np.interp(self.count / 2, centers, deviations)
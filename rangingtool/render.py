@@ -0,0 +1,99 @@
+from PyQt5 import QtCore
+import traceback
+from time import perf_counter
+
+
+class RenderScheduler(QtCore.QObject):
+    """Single render clock driving the views of all windows."""
+    def __init__(self, target_fps=10, min_fps=1, load_limit=0.5, *args, **kwargs):
+        """Initialize render scheduler.
+
+        The refresh rate is lowered from target_fps down to min_fps while rendering takes more than load_limit of the
+        GUI thread's time, and is raised back again when the load drops.
+        """
+        super().__init__(*args, **kwargs)
+
+        # Declare Variables
+        self.target_interval = 1 / target_fps
+        self.max_interval = 1 / min(min_fps, target_fps)
+        self.load_limit = load_limit
+        self.interval = self.target_interval
+        self.load = 0.
+        self._views = {}
+        self._last_tick = None
+
+        # Render timer
+        self.timer = QtCore.QTimer(self)
+        self.timer.timeout.connect(self._tick)
+        self.timer.start(round(self.interval * 1E3))
+
+    @property
+    def effective_fps(self):
+        """Current refresh rate of the render clock."""
+        return 1 / self.interval
+
+    def register(self, widget, callback, poll_interval=None):
+        """Register a view, rendered by callback when dirty and visible.
+
+        Views without a data signal can be polled by setting poll_interval (s), i.e., they are marked dirty
+        periodically.
+        """
+        self._views[widget] = {
+            'callback': callback,
+            'poll_interval': poll_interval,
+            'last_render': None,
+            'dirty': True
+        }
+
+    def unregister(self, widget):
+        """Unregister a view."""
+        self._views.pop(widget, None)
+
+    def mark_dirty(self, widget):
+        """Mark view to be rendered on the next tick."""
+        view = self._views.get(widget)
+        if view is not None:
+            view['dirty'] = True
+
+    @staticmethod
+    def is_shown(widget):
+        """Check whether the widget is actually visible on the screen."""
+        window = widget.window()
+        return widget.isVisible() and not window.isMinimized() and not widget.visibleRegion().isEmpty()
+
+    def _tick(self):
+        """Slot to timer for rendering all dirty and visible views."""
+        start = perf_counter()
+
+        for widget, view in list(self._views.items()):
+            # Mark polled views as dirty
+            if view['poll_interval'] is not None and (
+                    view['last_render'] is None or start - view['last_render'] >= view['poll_interval']):
+                view['dirty'] = True
+
+            # Skip unchanged and hidden views
+            if not view['dirty'] or not self.is_shown(widget):
+                continue
+
+            # A failing view must neither stop the other views nor stay dirty forever
+            try:
+                view['callback']()
+            except Exception:
+                traceback.print_exc()
+            finally:
+                view['dirty'] = False
+                view['last_render'] = start
+
+        # Adapt refresh rate to load of GUI thread, i.e., render time plus delay of the tick by other events, relative
+        # to the time between ticks
+        stop = perf_counter()
+        if self._last_tick is not None:
+            elapsed = max(stop - self._last_tick, 1E-9)
+            delay = max(start - self._last_tick - self.interval, 0)
+            self.load = (stop - start + delay) / elapsed
+            if self.load > self.load_limit:
+                self.interval = min(self.interval * 1.5, self.max_interval)
+            elif self.load < self.load_limit / 2:
+                self.interval = max(self.interval / 1.25, self.target_interval)
+            self.timer.setInterval(round(self.interval * 1E3))
+        self._last_tick = stop
@@ -0,0 +1,178 @@
+import json
+import struct
+import numpy as np
+from time import time
+from multiprocessing import shared_memory, resource_tracker
+
+# Layout of the shared memory:
+#   Header: magic, version, #slot, descriptor length, slot size, and sequence number of the latest frame
+#   Descriptor: JSON list of fields with name, dtype, shape, and offset within slot
+#   Slots: sequence number at begin and end of writing, timestamp, and fields (64-byte aligned)
+MAGIC = b'RTFR'
+VERSION = 1
+HEADER = struct.Struct('<4sIIIQ')
+SEQ_OFFSET = HEADER.size
+DESCRIPTOR_OFFSET = SEQ_OFFSET + 8
+SLOT_HEADER_SIZE = 64
+ALIGNMENT = 64
+
+
+def _align(size):
+    return -(-size // ALIGNMENT) * ALIGNMENT
+
+
+class SharedFrameRing:
+    """Writer of frames into a named shared-memory ring for zero-copy consumption by other local processes.
+
+    The shared memory is created on the first published frame, whereby the shapes and dtypes of its fields are fixed.
+    Readers detect overwritten frames by the sequence numbers (see SharedFrameReader).
+    """
+    def __init__(self, name, slots=64):
+        """Initialize ring of given number of slots."""
+        self.name = name
+        self.slots = slots
+        self.seq = 0
+        self._shm = None
+        self._fields = None
+        self._slot_size = None
+        self._slots_offset = None
+
+    def _create(self, fields):
+        """Create shared memory for fields."""
+        offset = SLOT_HEADER_SIZE
+        descriptor = []
+        for name, value in fields.items():
+            descriptor.append({'name': name, 'dtype': value.dtype.str, 'shape': value.shape, 'offset': offset})
+            offset = _align(offset + value.nbytes)
+        descriptor = json.dumps(descriptor).encode()
+
+        self._slot_size = offset
+        self._slots_offset = _align(DESCRIPTOR_OFFSET + len(descriptor))
+        self._shm = shared_memory.SharedMemory(
+            name=self.name, create=True, size=self._slots_offset + self.slots * self._slot_size
+        )
+        buf = self._shm.buf
+        buf[DESCRIPTOR_OFFSET:DESCRIPTOR_OFFSET + len(descriptor)] = descriptor
+        HEADER.pack_into(buf, 0, MAGIC, VERSION, self.slots, len(descriptor), self._slot_size)
+        struct.pack_into('<Q', buf, SEQ_OFFSET, 0)
+
+        # Views on the fields of each slot
+        self._fields = [
+            {
+                _field['name']: np.ndarray(_field['shape'], dtype=_field['dtype'], buffer=buf,
+                                           offset=self._slots_offset + idx * self._slot_size + _field['offset'])
+                for _field in json.loads(descriptor)
+            }
+            for idx in range(self.slots)
+        ]
+
+    def publish(self, **kwargs):
+        """Publish frame given by fields (scalars or arrays of constant shape and dtype), and get its sequence number."""
+        fields = {key: np.asarray(value) for key, value in kwargs.items() if value is not None}
+        if self._shm is None:
+            self._create(fields)
+
+        seq = self.seq + 1
+        idx = (seq - 1) % self.slots
+        slot_offset = self._slots_offset + idx * self._slot_size
+        buf = self._shm.buf
+
+        # Mark slot as being written, write fields, and mark slot as complete
+        struct.pack_into('<Q', buf, slot_offset, seq)
+        for key, value in self._fields[idx].items():
+            value[...] = fields[key]
+        struct.pack_into('<Qd', buf, slot_offset + 8, seq, time())
+        struct.pack_into('<Q', buf, SEQ_OFFSET, seq)
+        self.seq = seq
+        return seq
+
+    def close(self):
+        """Close and remove shared memory."""
+        if self._shm is not None:
+            self._fields = None
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+
+class SharedFrameReader:
+    """Reader of a shared-memory frame ring, mapping frames with zero copies.
+
+    The arrays of a frame are views on the shared memory, which may be overwritten by the writer at any time. Thus,
+    check is_valid(seq) after using (or copying) them. All views must be released before closing the reader.
+
+    Example:
+        with SharedFrameReader('rangingtool') as reader:
+            result = reader.read()
+            if result is not None:  # None if no frame yet, or overrun
+                seq, frame = result
+                distance = frame['distance'].copy()
+                if not reader.is_valid(seq):
+                    ...  # Overrun, i.e., frame was overwritten while reading
+                del frame
+    """
+    def __init__(self, name):
+        """Attach to shared memory of given name."""
+        try:
+            self._shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:  # Python < 3.13 tracks attached shared memory, and would remove it at exit
+            self._shm = shared_memory.SharedMemory(name=name)
+            resource_tracker.unregister(self._shm._name, 'shared_memory')
+
+        buf = self._shm.buf
+        magic, version, self.slots, descriptor_length, self._slot_size = HEADER.unpack_from(buf, 0)
+        if magic != MAGIC or version != VERSION:
+            self._shm.close()
+            raise ValueError('Shared memory %s is not a frame ring of version %d' % (name, VERSION))
+        self.descriptor = json.loads(bytes(buf[DESCRIPTOR_OFFSET:DESCRIPTOR_OFFSET + descriptor_length]))
+        self._slots_offset = _align(DESCRIPTOR_OFFSET + descriptor_length)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    @property
+    def seq(self):
+        """Sequence number of the latest frame (0 if none)."""
+        return struct.unpack_from('<Q', self._shm.buf, SEQ_OFFSET)[0]
+
+    def _slot_offset(self, seq):
+        return self._slots_offset + (seq - 1) % self.slots * self._slot_size
+
+    def is_valid(self, seq):
+        """Check if frame seq is completely written and not (being) overwritten."""
+        if seq < 1:
+            return False
+        seq_begin, seq_end = struct.unpack_from('<QQ', self._shm.buf, self._slot_offset(seq))
+        return seq_begin == seq and seq_end == seq
+
+    def read(self, seq=None):
+        """Get sequence number and frame (dict of views, and timestamp) of frame seq, or of the latest frame if None.
+
+        Returns None if the frame is not available, i.e., not yet published or already overwritten (overrun).
+        """
+        seq = self.seq if seq is None else seq
+        if not self.is_valid(seq):
+            return None
+        slot_offset = self._slot_offset(seq)
+        frame = {
+            _field['name']: np.ndarray(_field['shape'], dtype=_field['dtype'], buffer=self._shm.buf,
+                                       offset=slot_offset + _field['offset'])
+            for _field in self.descriptor
+        }
+        frame['timestamp'] = struct.unpack_from('<d', self._shm.buf, slot_offset + 16)[0]
+        return seq, frame
+
+    def read_since(self, last_seq):
+        """Get frames published after frame last_seq as list of (seq, frame), and number of lost frames (overrun)."""
+        seq = self.seq
+        first = max(last_seq + 1, seq - self.slots + 1, 1)
+        frames = [frame for frame in (self.read(_seq) for _seq in range(first, seq + 1)) if frame is not None]
+        lost = seq - last_seq - len(frames)
+        return frames, lost
+
+    def close(self):
+        """Detach from shared memory."""
+        self._shm.close()
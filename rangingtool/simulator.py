@@ -0,0 +1,215 @@
+import numpy as np
+from time import perf_counter, sleep
+from types import SimpleNamespace
+from scipy.constants import c as C0
+from twopilabs.sense.x1000 import SenseX1000
+from twopilabs.utils.usbtmc.usbtmc_exception import UsbTmcTimeoutException
+
+
+class SimulatedTarget:
+    """Point target of the simulator with distance trajectory d(t) = distance + velocity * t + vibration."""
+    def __init__(self, distance=1., reflectivity=1., velocity=0., amplitude=0., frequency=0., trajectory=None):
+        """Initialize target, whereby a callable trajectory (t in s -> distance in m) overrides the parameters."""
+        self.distance = distance
+        self.reflectivity = reflectivity
+        self.velocity = velocity
+        self.amplitude = amplitude
+        self.frequency = frequency
+        self.trajectory = trajectory
+
+    def distance_at(self, t):
+        """Get distance at time(s) t."""
+        if self.trajectory is not None:
+            return self.trajectory(t)
+        return self.distance + self.velocity * t + self.amplitude * np.sin(2 * np.pi * self.frequency * t)
+
+
+def parse_targets(text):
+    """Parse targets of the format 'distance[:reflectivity[:velocity[:amplitude[:frequency]]]],...'."""
+    return [
+        SimulatedTarget(*[float(value) for value in target.split(':')])
+        for target in text.split(',') if target.strip() != ''
+    ]
+
+
+class SimulatedSensor:
+    """Simulated Dracal sensor with slowly drifting temperature, pressure, humidity and CO2 concentration."""
+    def __init__(self, temp=20., press=101325., hum=40., co2=420., drift=1E-3, noise=1E-3, seed=None):
+        """Initialize sensor, whereby drift and noise are relative to the initial values per reading."""
+        self.values = {'temp': temp, 'press': press, 'hum': hum, 'co2': co2}
+        self.drift = drift
+        self.noise = noise
+        self.rng = np.random.default_rng(seed)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        pass
+
+    def _read(self, key):
+        """Read value after random-walk drift."""
+        value = self.values[key]
+        self.values[key] = value + abs(value) * self.drift * self.rng.standard_normal()
+        return self.values[key] + abs(value) * self.noise * self.rng.standard_normal()
+
+    def get_temp(self):
+        return self._read('temp')
+
+    def get_press(self):
+        return self._read('press')
+
+    def get_hum(self):
+        return self._read('hum')
+
+    def get_co2(self):
+        return self._read('co2')
+
+
+class _SimulatedAcquisition:
+    """Acquisition of the simulated radar, blocking on read until the end of the frame (real-time mode)."""
+    def __init__(self, data, ready_time):
+        self._data = data
+        self._ready_time = ready_time
+
+    def read(self):
+        if self._ready_time is not None:
+            sleep(max(self._ready_time - perf_counter(), 0))
+        return self._data
+
+
+class SimulatedSenseX1000Device:
+    """Simulated 2piSENSE X1000 device, providing the subset of the device API used by the background process."""
+    def __init__(self, simulator):
+        """Initialize device."""
+        self.simulator = simulator
+        self._config = None
+        self._start_time = None
+        self._next_frame_time = None
+        self._rst()
+
+        # SCPI subsystems
+        self.core = SimpleNamespace(rst=self._rst, cls=lambda: None)
+        self.sense = SimpleNamespace(
+            frequency_start=lambda value: self._set('FREQUENCY', 'START', value),
+            frequency_stop=lambda value: self._set('FREQUENCY', 'STOP', value),
+            sweep_time=lambda value: self._set('SWEEP', 'TIME', value),
+            sweep_count=lambda value: self._set('SWEEP', 'COUNT', value),
+            sweep_period=lambda value: self._set('SWEEP', 'PERIOD', value),
+            sweep_mode=lambda value: self._set('SWEEP', 'MODE', value.name),
+            dump=self._dump
+        )
+        self.calc = SimpleNamespace(trace_list=lambda traces: None)
+        self.control = SimpleNamespace(accessory_enable=lambda enabled: None)
+        self.initiate = SimpleNamespace(immediate_and_receive=self._immediate_and_receive)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        pass
+
+    def _rst(self):
+        """Recall preset."""
+        self._config = {
+            'FREQUENCY': {'START': 126E9, 'STOP': 182E9},
+            'SWEEP': {'TIME': 1E-3, 'POINTS': None, 'COUNT': 1, 'PERIOD': 1E-3, 'MODE': 'NORMAL'}
+        }
+
+    def _set(self, group, key, value):
+        self._config[group][key] = value
+
+    def _dump(self):
+        """Get configuration dictionary, including the derived values."""
+        config = {group: dict(values) for group, values in self._config.items()}
+        config['FREQUENCY']['CENTER'] = (config['FREQUENCY']['START'] + config['FREQUENCY']['STOP']) / 2
+        config['FREQUENCY']['SPAN'] = config['FREQUENCY']['STOP'] - config['FREQUENCY']['START']
+        config['SWEEP']['POINTS'] = self.simulator.points
+        return config
+
+    def _immediate_and_receive(self):
+        """Initiate acquisition of one frame of sweeps."""
+        simulator = self.simulator
+        now = perf_counter()
+        if self._start_time is None:
+            self._start_time = self._next_frame_time = now
+
+        # Frame timing
+        frame_time = self._next_frame_time - self._start_time
+        self._next_frame_time += self._config['SWEEP']['COUNT'] * self._config['SWEEP']['PERIOD']
+        if simulator.realtime:
+            self._next_frame_time = max(self._next_frame_time, now)
+
+        if simulator.rng.random() < simulator.timeout_probability:
+            raise UsbTmcTimeoutException('Simulated USB TMC timeout')
+
+        array = simulator.simulate_frame(self._dump(), frame_time)
+        data = SimpleNamespace(array=array, header=SimpleNamespace(data_size=simulator.data_size))
+        return _SimulatedAcquisition(data, self._next_frame_time if simulator.realtime else None)
+
+
+class RadarSimulator:
+    """Synthetic FMCW radar and atmospheric sensors for hardware-free operation of the background process.
+
+    It replaces the SenseX1000 class (find_devices, open_device, SweepMode) and dracalvcp.Device (open_sensor).
+    """
+    SweepMode = SenseX1000.SweepMode
+
+    def __init__(self, targets=None, noise=1E-3, multipath=0.1, points=4096, data_size=2, realtime=True,
+                 timeout_probability=0., sensor=None, seed=None):
+        """Initialize simulator.
+
+        The amplitude of a target at 1 m with reflectivity 1 is 10 % of full scale, and decays by the square of the
+        distance. noise is the standard deviation of white Gaussian noise relative to full scale, and multipath is the
+        relative amplitude of the double-bounce echo of each target. In real-time mode, frames are delivered at the
+        configured sweep period, otherwise as fast as possible.
+        """
+        self.targets = targets if targets is not None else [SimulatedTarget()]
+        self.noise = noise
+        self.multipath = multipath
+        self.points = points
+        self.data_size = data_size
+        self.realtime = realtime
+        self.timeout_probability = timeout_probability
+        self.sensor = sensor if sensor is not None else SimulatedSensor(seed=seed)
+        self.rng = np.random.default_rng(seed)
+
+    def find_devices(self):
+        """Find simulated devices."""
+        return [SimpleNamespace(serialnum='SIMULATOR')]
+
+    def open_device(self, _):
+        """Open simulated radar device."""
+        return SimulatedSenseX1000Device(self)
+
+    def open_sensor(self, _):
+        """Open simulated atmospheric sensor."""
+        return self.sensor
+
+    def simulate_frame(self, config, frame_time):
+        """Simulate IF data of shape [#Sweep, #Trace, #Sample] as integers of data_size bytes."""
+        f_start, f_stop = config['FREQUENCY']['START'], config['FREQUENCY']['STOP']
+        sweep_time = config['SWEEP']['TIME']
+        n_sweeps = config['SWEEP']['COUNT']
+
+        # Frequency ramp per sweep, i.e., alternating up and down chirps in alternating mode
+        is_reversed = (np.arange(n_sweeps) % 2 == 1) & (config['SWEEP']['MODE'] == 'ALTERNATING')
+        f0 = np.where(is_reversed, f_stop, f_start)[:, np.newaxis, np.newaxis]
+        slope = (np.where(is_reversed, f_start - f_stop, f_stop - f_start) / sweep_time)[:, np.newaxis, np.newaxis]
+        t = np.arange(self.points) / self.points * sweep_time
+
+        # Echoes of targets, and double-bounce echoes [#Sweep, #Echo, 1]
+        sweep_times = frame_time + np.arange(n_sweeps) * config['SWEEP']['PERIOD']
+        distance = np.stack([target.distance_at(sweep_times) for target in self.targets], axis=-1)
+        amplitude = 0.1 * np.asarray([target.reflectivity for target in self.targets]) / distance ** 2
+        distance = np.concatenate((distance, 2 * distance), axis=-1)[..., np.newaxis]
+        amplitude = np.concatenate((amplitude, self.multipath * amplitude / 4), axis=-1)[..., np.newaxis]
+        tau = 2 * distance / C0
+
+        # IF signal of dechirped echoes
+        if_data = np.sum(amplitude * np.cos(2 * np.pi * (f0 * tau + slope * tau * t - slope * tau ** 2 / 2)), axis=1)
+        if_data += self.noise * self.rng.standard_normal(if_data.shape)
+
+        full_scale = 2 ** (8 * self.data_size - 1)
+        if_data = np.clip(np.round(if_data * full_scale), -full_scale, full_scale - 1)
+        return if_data.astype('<i%d' % self.data_size)[:, np.newaxis, :]
@@ -0,0 +1,181 @@
+from PyQt5 import QtWidgets, QtGui, QtCore, uic
+import numpy as np
+import pyqtgraph as pg
+from pkg_resources import resource_filename
+
+
+class RingBufferImage:
+    """Preallocated ring buffer of image rows.
+
+    Every row is written twice, at idx and at idx + length, such that the last length rows are always available as a
+    contiguous view of the buffer, i.e., neither rolling nor copying is required for reading.
+    """
+    def __init__(self, length, width, dtype=float):
+        """Initialize ring buffer."""
+        self.length = length
+        self.width = width
+        self.dtype = np.dtype(dtype)
+        self.fill_value = np.nan if self.dtype.kind == 'f' else 0
+        self.buffer = np.full((2 * length, width), self.fill_value, dtype=self.dtype)
+        self.idx = 0
+
+    def write(self, row):
+        """Write row as the newest row of the buffer."""
+        self.buffer[self.idx] = row
+        self.buffer[self.idx + self.length] = row
+        self.idx = (self.idx + 1) % self.length
+
+    def view(self):
+        """Get view of the rows, ordered from oldest to newest."""
+        return self.buffer[self.idx:self.idx + self.length]
+
+
+class WaterfallImageItem(pg.GraphicsObject):
+    """Persistent image of a ring buffer of columns (frames), updated incrementally.
+
+    Only new columns are mapped through the lookup table into the image, and painting draws the image in two pieces
+    (oldest to newest), i.e., a refresh costs a blit of the image but no recomputation of levels or colors.
+    """
+    def __init__(self, length, height, rect, lut):
+        """Initialize image of length columns and height rows, covering rect (scene coordinates)."""
+        super().__init__()
+        self.length = length
+        self.height = height
+        self.rect = rect
+        self.lut = (0xFF000000 | (lut[:, 0].astype(np.uint32) << 16) | (lut[:, 1].astype(np.uint32) << 8)
+                    | lut[:, 2].astype(np.uint32))  # RGB to 32-bit ARGB
+        self.image = QtGui.QImage(length, height, QtGui.QImage.Format_RGB32)
+        self.image.fill(QtGui.QColor(0, 0, 0))
+        pointer = self.image.bits()
+        pointer.setsize(self.image.byteCount())
+        self.pixels = np.ndarray((height, self.image.bytesPerLine() // 4), dtype=np.uint32, buffer=pointer)
+        self.idx = 0
+
+    def write(self, indices):
+        """Write column of color indices (uint8) as the newest column."""
+        self.pixels[:, self.idx] = self.lut[indices]
+        self.idx = (self.idx + 1) % self.length
+
+    def write_all(self, indices):
+        """Write all columns of color indices [#Column, #Row], ordered from oldest to newest."""
+        self.pixels[:, :self.length] = self.lut[indices].T
+        self.idx = 0
+
+    def boundingRect(self):
+        return self.rect
+
+    def paint(self, painter, *_):
+        rect = self.rect
+        column_width = rect.width() / self.length
+        older = self.length - self.idx  # Columns idx, ..., length - 1 are the oldest
+        painter.drawImage(QtCore.QRectF(rect.left(), rect.top(), older * column_width, rect.height()),
+                          self.image, QtCore.QRectF(self.idx, 0, older, self.height))
+        if self.idx > 0:
+            painter.drawImage(QtCore.QRectF(rect.left() + older * column_width, rect.top(),
+                                            self.idx * column_width, rect.height()),
+                              self.image, QtCore.QRectF(0, 0, self.idx, self.height))
+
+
+class WaterfallPlotWindow(QtWidgets.QWidget):
+    def __init__(self, background_process, render_scheduler, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        # Initialize appearance of the UI
+        uic.loadUi(resource_filename(__name__, './waterfall.ui'), self)
+
+        # Declare Variables
+        self.background_process = background_process
+        self.render_scheduler = render_scheduler
+        self.image_buffer = None
+        self.image = None
+        self.lut = pg.colormap.get('viridis').getLookupTable(nPts=256, alpha=False)
+        self.crop = None  # Cached crop of the range axis, i.e., (roi, len(time_axis), slice)
+        self.distance_range = None
+
+        # Register at render clock
+        self.render_scheduler.register(self, self.update_measured_data)
+
+        # Signals
+        self.sb_history_length.valueChanged.connect(self.settings_changed)
+        self.dsb_level_min.valueChanged.connect(self.levels_changed)
+        self.dsb_level_max.valueChanged.connect(self.levels_changed)
+        self.cbox_quantize.clicked.connect(self.settings_changed)
+
+        # Slots to background process (each displayed frame is a row of the waterfall)
+        self.background_process.mailbox.new_data_signal.connect(self.new_data)
+
+        # Setup plot widget
+        self.plt_waterfall.getAxis('left').setLabel('Distance (m)')
+        self.plt_waterfall.getAxis('bottom').setLabel('Frame (#)')
+
+        # Set initial values of the UI
+        self.sb_history_length.setValue(1000)
+        self.dsb_level_min.setValue(-120)
+        self.dsb_level_max.setValue(0)
+
+    def closeEvent(self, event):
+        # Unregister from render clock & Disconnect new data signal
+        self.render_scheduler.unregister(self)
+        self.background_process.mailbox.new_data_signal.disconnect(self.new_data)
+
+        event.accept()
+
+    def settings_changed(self, _):
+        # Reset image buffer, which is reallocated by the next frame
+        self.image_buffer = None
+
+    def levels_changed(self, _):
+        # Quantized rows depend on levels, whereas the image is recolored from unquantized rows
+        if self.cbox_quantize.isChecked():
+            self.image_buffer = None
+        elif self.image_buffer is not None:
+            self.image.write_all(self.color_indices(self.image_buffer.view()))
+        self.render_scheduler.mark_dirty(self)
+
+    def color_indices(self, rows):
+        """Map rows (dB) to color indices (uint8) by the levels."""
+        level_min = self.dsb_level_min.value()
+        level_max = self.dsb_level_max.value()
+        scale = 255 / max(level_max - level_min, 1E-9)
+        return np.clip(np.nan_to_num((rows - level_min) * scale), 0, 255).astype(np.uint8)
+
+    def new_data(self, value):
+        """Slot for incoming data."""
+        time_axis = value.time_axis
+        roi = self.background_process.roi
+
+        # Crop echo profile to ROI
+        if self.crop is None or self.crop[0] != roi or self.crop[1] != len(time_axis):
+            idx = np.flatnonzero((time_axis >= roi[0]) & (time_axis <= roi[1])) if roi is not None else []
+            if len(idx) < 2:
+                idx = np.arange(len(time_axis) // 2)
+            self.crop = (roi, len(time_axis), slice(idx[0], idx[-1] + 1))
+            self.distance_range = (time_axis[idx[0]] * 3E8 / 2, time_axis[idx[-1]] * 3E8 / 2)
+            self.image_buffer = None
+        row = value.td_data_db[0][self.crop[2]]  # first sweep
+
+        # Allocate image buffer and image
+        if self.image_buffer is None:
+            length = self.sb_history_length.value()
+            self.image_buffer = RingBufferImage(
+                length, len(row), dtype=np.uint8 if self.cbox_quantize.isChecked() else np.float32
+            )
+            if self.image is not None:
+                self.plt_waterfall.removeItem(self.image)
+            # Image axes are (frame, distance)
+            self.image = WaterfallImageItem(length, len(row), QtCore.QRectF(
+                -length, self.distance_range[0], length, self.distance_range[1] - self.distance_range[0]
+            ), self.lut)
+            self.plt_waterfall.addItem(self.image)
+
+        # Write row into image buffer, and its colors into the image
+        indices = self.color_indices(row)
+        self.image_buffer.write(indices if self.cbox_quantize.isChecked() else row)
+        self.image.write(indices)
+
+        self.render_scheduler.mark_dirty(self)
+
+    def update_measured_data(self):
+        """Slot to timer for updating user interface with measured data."""
+        if self.image is not None:
+            self.image.update()
@@ -3,6 +3,8 @@ from PyQt5 import QtWidgets, QtGui
 import argparse
 from rangingtool import MainWindow
 from rangingtool import BackgroundProcess
+from rangingtool.simulator import RadarSimulator, parse_targets
+from rangingtool.metrics import MetricsServer
 
 
 def main():
@@ -11,8 +13,36 @@ def main():
     parser.add_argument('--radar_serial_number', type=str, required=False)
     parser.add_argument('--atm_sensor_comport', type=str, required=False)
     parser.add_argument('--co2_sensor_comport', type=str, required=False)
+    parser.add_argument('--render_fps', type=float, default=10, required=False)
+    parser.add_argument('--if_buffer_length', type=int, default=100, required=False)
+    parser.add_argument('--record_queue_length', type=int, default=1000, required=False)
+    parser.add_argument('--simulate', action='store_true')
+    parser.add_argument('--sim_targets', type=str, default='1.0:1.0', required=False,
+                        help='distance[:reflectivity[:velocity[:amplitude[:frequency]]]],...')
+    parser.add_argument('--sim_noise', type=float, default=1E-3, required=False)
+    parser.add_argument('--sim_multipath', type=float, default=0.1, required=False)
+    parser.add_argument('--sim_no_realtime', action='store_true')
+    parser.add_argument('--shm_name', type=str, required=False, help='Name of shared-memory frame ring')
+    parser.add_argument('--shm_slots', type=int, default=64, required=False)
+    parser.add_argument('--metrics_port', type=int, required=False, help='Port of local metrics endpoint')
+    parser.add_argument('--raw_codec', type=str, default='zlib', choices=['zlib', 'bz2', 'lzma'], required=False,
+                        help='Compression codec of raw data')
+    parser.add_argument('--raw_level', type=int, default=6, required=False, help='Compression level of raw data')
     args = parser.parse_args()
 
+    # Init simulator, including simulated atmospheric sensors
+    if args.simulate:
+        simulator = RadarSimulator(
+            targets=parse_targets(args.sim_targets),
+            noise=args.sim_noise,
+            multipath=args.sim_multipath,
+            realtime=not args.sim_no_realtime
+        )
+        args.atm_sensor_comport = args.atm_sensor_comport or 'SIM'
+        args.co2_sensor_comport = args.co2_sensor_comport or 'SIM'
+    else:
+        simulator = None
+
     # Init QT application
     app = QtWidgets.QApplication(sys.argv)
 
@@ -38,12 +68,24 @@ def main():
     background_process = BackgroundProcess(
         radar_serial_number=args.radar_serial_number,
         atm_sensor_comport=args.atm_sensor_comport,
-        co2_sensor_comport=args.co2_sensor_comport
+        co2_sensor_comport=args.co2_sensor_comport,
+        if_buffer_length=args.if_buffer_length,
+        record_queue_length=args.record_queue_length,
+        simulator=simulator,
+        shared_memory_name=args.shm_name,
+        shared_memory_slots=args.shm_slots
     )
     app.aboutToQuit.connect(background_process.stop)
 
+    # Serve operational metrics (Prometheus text format)
+    if args.metrics_port is not None:
+        metrics_server = MetricsServer(background_process, args.metrics_port)
+        metrics_server.start()
+        app.aboutToQuit.connect(metrics_server.stop)
+
     # Show main window
-    win = MainWindow(app, background_process)
+    win = MainWindow(app, background_process, render_fps=args.render_fps, raw_data_codec=args.raw_codec,
+                     raw_data_level=args.raw_level)
     win.show()
 
     sys.exit(app.exec_())